@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class RbacProjectConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'RBAC_Project'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .db.sqlite import apply_pragmas
+        from .instrumentation import install_query_recorder
+        connection_created.connect(apply_pragmas, dispatch_uid='sqlite_pragmas')
+        connection_created.connect(install_query_recorder, dispatch_uid='instrumentation')
@@ -14,3 +14,6 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'RBAC_Project.settings')
 
 application = get_asgi_application()
+
+# Vercel's Python runtime looks for `app`.
+app = application
@@ -0,0 +1,76 @@
+"""
+Async support for DRF class-based views.
+
+DRF's APIView only calls synchronous handlers. AsyncAPIView runs the
+request through the same authentication, permission and exception
+handling, but awaits `async def` handlers, so under ASGI a view waiting on
+the database does not hold a worker thread.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.views import APIView
+
+
+def inherit_schema(method):
+    """
+    Document an async handler with the swagger_auto_schema of the sync
+    handler it replaces.
+    """
+    return swagger_auto_schema(**getattr(method, '_swagger_auto_schema', {}))
+
+
+async def iterate_in_thread(iterator):
+    """
+    Async iterator over a synchronous one, advancing it one item at a time
+    in the thread-sensitive executor, where its database connection lives.
+
+    StreamingHttpResponse consumes a synchronous iterator under ASGI with
+    sync_to_async(list), i.e. it reads everything before sending anything;
+    wrapping it with this keeps the response streaming.
+    """
+    done = object()
+    advance = sync_to_async(next)
+    try:
+        while (item := await advance(iterator, done)) is not done:
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines. Django detects this from the
+    handlers (View.view_is_async) and awaits dispatch().
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication and permission classes are synchronous and
+            # may touch the database, so they run in a thread.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
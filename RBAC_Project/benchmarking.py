@@ -0,0 +1,81 @@
+"""
+Shared helpers for the bench_* management commands.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.client import FakePayload, RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    Run the block against a throwaway test database so benchmarks never
+    write to the configured one.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity)
+        teardown_test_environment()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def summarize(latencies, elapsed):
+    """
+    Summarize per-call latencies (seconds) and the wall time they took.
+    """
+    return {
+        'count': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def call_wsgi(handler, method, path, query='', body=b'', headers=None, **extra):
+    """
+    Send one request through a WSGI handler the way a server would,
+    including closing the response (which fires request_finished and so
+    closes or keeps the database connection per CONN_MAX_AGE). `extra`
+    goes into the environ, e.g. REMOTE_ADDR. Returns the status code.
+    """
+    environ = RequestFactory()._base_environ(
+        REQUEST_METHOD=method,
+        PATH_INFO=path,
+        QUERY_STRING=query,
+        CONTENT_TYPE='application/json',
+        CONTENT_LENGTH=str(len(body)),
+        **{'wsgi.input': FakePayload(body)},
+        **{'HTTP_' + name.upper().replace('-', '_'): value for name, value in (headers or {}).items()},
+        **extra,
+    )
+    statuses = []
+    response = handler(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
@@ -0,0 +1,27 @@
+"""
+PostgreSQL backend that records connection metrics
+(RBAC_Project.dbmetrics) and otherwise behaves exactly like Django's.
+"""
+
+import time
+
+from django.db.backends.postgresql import base
+
+from RBAC_Project.dbmetrics import metrics
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        # A new connection (TCP, TLS and auth handshakes) or, with
+        # OPTIONS['pool'], the wait for a pooled one.
+        start = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        metrics.record_acquire(time.perf_counter() - start)
+        return connection
+
+    def is_usable(self):
+        usable = super().is_usable()
+        if not usable:
+            metrics.record_health_check_failure()
+        return usable
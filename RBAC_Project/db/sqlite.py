@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    connection_created receiver that applies settings.SQLITE_PRAGMAS to
+    every new SQLite connection. Other backends are left alone.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,83 @@
+"""
+Database connection metrics: how often connections are opened, how long
+opening (or waiting for a pooled one) takes, failed health checks, and the
+psycopg pool's own counters when OPTIONS['pool'] is set.
+
+The numbers are per process. They are recorded by the
+RBAC_Project.db.postgresql backend and served by
+RBAC_Project.views.DatabaseMetricsView.
+"""
+
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connections
+
+from RBAC_Project.benchmarking import percentile
+
+
+class ConnectionMetrics:
+    """
+    Thread-safe counters plus the last `samples` acquire times.
+    """
+
+    def __init__(self, samples=1024):
+        self._lock = threading.Lock()
+        self._acquire_times = deque(maxlen=samples)
+        self.acquired = 0
+        self.acquire_seconds = 0.0
+        self.health_check_failures = 0
+
+    def record_acquire(self, seconds):
+        with self._lock:
+            self.acquired += 1
+            self.acquire_seconds += seconds
+            self._acquire_times.append(seconds)
+
+    def record_health_check_failure(self):
+        with self._lock:
+            self.health_check_failures += 1
+
+    def reset(self):
+        with self._lock:
+            self._acquire_times.clear()
+            self.acquired = 0
+            self.acquire_seconds = 0.0
+            self.health_check_failures = 0
+
+    def snapshot(self):
+        with self._lock:
+            samples = list(self._acquire_times)
+            return {
+                'acquired': self.acquired,
+                'acquire_seconds_total': self.acquire_seconds,
+                'acquire_p50_ms': percentile(samples, 50) * 1000,
+                'acquire_p99_ms': percentile(samples, 99) * 1000,
+                'health_check_failures': self.health_check_failures,
+            }
+
+
+metrics = ConnectionMetrics()
+
+
+def pool_stats(alias='default'):
+    """
+    The psycopg pool's counters (pool_size, pool_available,
+    requests_waiting, requests_wait_ms, ...), or None without a pool.
+    """
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is None:
+        return None
+    return pool.get_stats()
+
+
+def database_metrics(alias='default'):
+    settings_dict = connections[alias].settings_dict
+    return {
+        'mode': settings.DB_CONNECTION_MODE,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE', 0),
+        'conn_health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+        'connections': metrics.snapshot(),
+        'pool': pool_stats(alias),
+    }
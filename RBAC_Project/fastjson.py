@@ -0,0 +1,78 @@
+"""
+JSON renderer and parser backed by orjson, which encodes UUIDs and
+datetimes natively and is several times faster than the json module.
+Without orjson installed both classes behave exactly like DRF's
+JSONRenderer and JSONParser.
+"""
+
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The JSONEncoder instance handles what orjson can't: Decimal, lazy
+# translation strings, querysets, timedeltas and so on.
+_fallback_encoder = JSONEncoder()
+
+
+def dumps(data):
+    """
+    Compact UTF-8 JSON bytes, with UTC datetimes written with a "Z" the
+    way DRF writes them.
+    """
+    if orjson is None:
+        return _fallback_encoder.encode(data).encode()
+    return orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_UTC_Z)
+
+
+def loads(data):
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer. Falls back to DRF's encoder when orjson is
+    missing, the output has to be indented (an `indent` media type
+    parameter or the browsable API), or UNICODE_JSON / COMPACT_JSON are
+    turned off.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps(data)
+        # Like JSONRenderer: U+2028 and U+2029 are valid JSON but not valid
+        # JavaScript, so escape them.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in JSONParser using orjson for UTF-8 bodies.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,242 @@
+"""
+Per-request instrumentation: for a sample of requests, time the request,
+its ORM queries and the rendering of the response, and aggregate the
+numbers per view ("PostView.get", "LoginView.post", ...).
+
+Sampled responses carry a Server-Timing header; the per-view totals are
+served in the Prometheus text format by RBAC_Project.views.PrometheusMetricsView.
+The numbers are per process and only cover sampled requests; divide
+counters by rbac_instrumentation_sample_rate to estimate the totals.
+"""
+
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.views import View
+
+# Upper bounds (seconds) of the request duration histogram.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The timings of the request being handled, if it was sampled. A context
+# variable rather than a thread-local, so that it follows async views into
+# the threads sync_to_async runs their queries in.
+_active = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('view', 'start', 'queries', 'query_seconds', 'render_start', 'render_seconds')
+
+    def __init__(self):
+        self.view = 'unresolved'
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.render_start = None
+        self.render_seconds = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper that adds each query's count and duration to
+    the sampled request, if any.
+    """
+    timings = _active.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.query_seconds += time.perf_counter() - start
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    connection_created receiver: wrap every new connection with
+    record_query (the hook connection.execute_wrapper() uses), so queries
+    made from any thread are seen.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ViewStats:
+    __slots__ = ('requests', 'seconds', 'buckets', 'queries', 'query_seconds', 'render_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.requests = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.render_seconds = 0.0
+        self.response_bytes = 0
+
+
+class Registry:
+    """
+    Thread-safe per-view totals of the sampled requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, timings, seconds, response_bytes):
+        with self._lock:
+            stats = self._views.get(timings.view)
+            if stats is None:
+                stats = self._views[timings.view] = ViewStats()
+            stats.requests += 1
+            stats.seconds += seconds
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+            stats.queries += timings.queries
+            stats.query_seconds += timings.query_seconds
+            stats.render_seconds += timings.render_seconds
+            stats.response_bytes += response_bytes
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {
+                    'requests': stats.requests,
+                    'seconds': stats.seconds,
+                    'buckets': list(stats.buckets),
+                    'queries': stats.queries,
+                    'query_seconds': stats.query_seconds,
+                    'render_seconds': stats.render_seconds,
+                    'response_bytes': stats.response_bytes,
+                }
+                for view, stats in self._views.items()
+            }
+
+    def render_prometheus(self):
+        views = sorted(self.snapshot().items())
+        lines = [
+            '# HELP rbac_instrumentation_sample_rate Fraction of requests that are instrumented.',
+            '# TYPE rbac_instrumentation_sample_rate gauge',
+            f'rbac_instrumentation_sample_rate {settings.INSTRUMENTATION_SAMPLE_RATE}',
+            '# HELP rbac_request_duration_seconds Time spent handling sampled requests, by view.',
+            '# TYPE rbac_request_duration_seconds histogram',
+        ]
+        for view, stats in views:
+            label = _escape(view)
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                cumulative += count
+                lines.append(f'rbac_request_duration_seconds_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'rbac_request_duration_seconds_bucket{{view="{label}",le="+Inf"}} {stats["requests"]}')
+            lines.append(f'rbac_request_duration_seconds_sum{{view="{label}"}} {stats["seconds"]}')
+            lines.append(f'rbac_request_duration_seconds_count{{view="{label}"}} {stats["requests"]}')
+
+        counters = (
+            ('rbac_db_queries_total', 'queries', 'ORM queries made by sampled requests.'),
+            ('rbac_db_query_seconds_total', 'query_seconds', 'Time spent in ORM queries by sampled requests.'),
+            ('rbac_render_seconds_total', 'render_seconds', 'Time spent serializing (rendering) sampled responses.'),
+            ('rbac_response_bytes_total', 'response_bytes', 'Body bytes of sampled responses.'),
+        )
+        for name, key, help_text in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for view, stats in views:
+                lines.append(f'{name}{{view="{_escape(view)}"}} {stats[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+class InstrumentationMiddleware:
+    """
+    Instruments INSTRUMENTATION_SAMPLE_RATE of the requests. Place it first
+    in MIDDLEWARE so that the total includes the other middleware.
+    Unsampled requests cost one random() call.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _active.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _active.reset(token)
+        return self.finish(timings, response)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _active.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _active.reset(token)
+        return self.finish(timings, response)
+
+    @staticmethod
+    def sampled():
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _active.get()
+        if timings is not None:
+            view_class = getattr(view_func, 'view_class', None)
+            name = view_class.__name__ if view_class else getattr(view_func, '__name__', 'view')
+            # The method comes from the client: bound the label values.
+            method = request.method.lower()
+            if method not in getattr(view_class, 'http_method_names', View.http_method_names):
+                method = 'other'
+            timings.view = f'{name}.{method}'
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that.
+        timings = _active.get()
+        if timings is not None:
+            timings.render_start = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self.rendered(timings))
+        return response
+
+    @staticmethod
+    def rendered(timings):
+        timings.render_seconds = time.perf_counter() - timings.render_start
+
+    def finish(self, timings, response):
+        seconds = time.perf_counter() - timings.start
+        response_bytes = 0 if response.streaming else len(response.content)
+        registry.record(timings, seconds, response_bytes)
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={timings.query_seconds * 1000:.2f};desc="{timings.queries} queries", '
+                f'render;dur={timings.render_seconds * 1000:.2f}, '
+                f'total;dur={seconds * 1000:.2f}'
+            )
+        return response
@@ -0,0 +1,216 @@
+"""
+Load-test harness: fixture generators, per-endpoint scenarios driven
+through the Django test client, and baseline comparison for CI. Used by
+`manage.py loadtest`.
+"""
+
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from RBAC_Project.benchmarking import summarize
+from blog_app.models import Post, Comment
+from blog_app.pagination import KeysetPagination
+from blog_app.search import search_vector
+from user_app.models import User
+from user_app.tokens import RBACRefreshToken
+
+# Posts per scale; users and comments are derived from it.
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+PASSWORD = 'loadtest-password-123'
+
+
+def _batches(make, total, batch_size):
+    for start in range(0, total, batch_size):
+        yield [make(i) for i in range(start, min(start + batch_size, total))]
+
+
+def generate_fixtures(posts, users=None, comments=None, batch_size=5000):
+    """
+    Insert `users` users (default posts / 100, at least 10), `posts` posts
+    spread over them and `comments` comments (default one per post), in
+    bulk_create batches. All users share one password hash, so generating
+    a million rows costs one hash. Posts and comments are dealt round-robin,
+    so the denormalized counters are set arithmetically as rows are built.
+    """
+    users = users or max(10, posts // 100)
+    comments = posts if comments is None else comments
+    encoded = make_password(PASSWORD)
+
+    user_ids = []
+    for batch in _batches(
+        lambda i: User(
+            email=f'load{i}@example.com', username=f'load{i}', password=encoded,
+            post_count=posts // users + (i < posts % users),
+        ),
+        users, batch_size,
+    ):
+        User.objects.bulk_create(batch)
+        user_ids.extend(user.pk for user in batch)
+
+    def make_post(i):
+        post = Post(
+            title=f'Load test post {i}', content=f'Body of post {i}.', created_by_id=user_ids[i % users],
+            comment_count=comments // posts + (i < comments % posts),
+        )
+        post.search_vector = search_vector(post)
+        return post
+
+    post_ids = []
+    for batch in _batches(make_post, posts, batch_size):
+        Post.objects.bulk_create(batch)
+        post_ids.extend(post.pk for post in batch)
+
+    def make_comment(i):
+        comment = Comment(post_id=post_ids[i % posts], content=f'Comment {i}.', created_by_id=user_ids[(i * 7) % users])
+        comment.search_vector = search_vector(comment)
+        return comment
+
+    for batch in _batches(make_comment, comments, batch_size):
+        Comment.objects.bulk_create(batch)
+
+    return {'users': users, 'posts': posts, 'comments': comments}
+
+
+class LoadTest:
+    """
+    Builds the requests of each scenario up front (tokens, fixture rows),
+    then sends them one by one, timing each and counting its queries.
+    """
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.client = Client()
+        self.user = User.objects.filter(email='load0@example.com').first() or User.objects.create(
+            email='load0@example.com', username='load0', password=make_password(PASSWORD),
+        )
+        self.auth = {'Authorization': f'Bearer {RBACRefreshToken.for_user(self.user).access_token}'}
+
+    def scenarios(self):
+        return {
+            'register': self.register,
+            'login': self.login,
+            'logout': self.logout,
+            'post_list': self.post_list,
+            'post_list_pages': self.post_list_pages,
+            'post_create': self.post_create,
+            'post_delete': self.post_delete,
+            'comment_create': self.comment_create,
+        }
+
+    # Each scenario returns a list of (method, url, data, headers, expected status).
+
+    def register(self):
+        run = uuid.uuid4().hex[:8]
+        return [
+            ('post', reverse('register'),
+             {'email': f'new-{run}-{i}@example.com', 'username': f'new-{run}-{i}', 'password': PASSWORD}, {}, 201)
+            for i in range(self.requests)
+        ]
+
+    def login(self):
+        return [
+            ('post', reverse('login'), {'email': self.user.email, 'password': PASSWORD}, {}, 200)
+            for _ in range(self.requests)
+        ]
+
+    def logout(self):
+        return [
+            ('post', reverse('logout'), {'refresh': str(RBACRefreshToken.for_user(self.user))}, {}, 200)
+            for _ in range(self.requests)
+        ]
+
+    def post_list(self):
+        # The first page, as most clients ask for it: served from the cache
+        # after the first request.
+        return [
+            ('get', reverse('posts'), {'page_size': 20}, self.auth, 200)
+            for _ in range(self.requests)
+        ]
+
+    def post_list_pages(self):
+        # Successive pages, each a cache miss. Cursors come straight from
+        # the table so that building them doesn't warm the cache.
+        rows = Post.objects.order_by(*KeysetPagination.get_ordering()).only('id', 'created_at')
+        cursors = [None] + [
+            KeysetPagination.encode_cursor(post) for post in rows[19:(self.requests - 1) * 20:20]
+        ]
+        return [
+            ('get', reverse('posts'), {'page_size': 20, **({'cursor': cursor} if cursor else {})}, self.auth, 200)
+            for cursor in cursors
+        ]
+
+    def post_create(self):
+        return [
+            ('post', reverse('posts'), {'title': f'Created {i}', 'content': 'Load test body.'}, self.auth, 201)
+            for i in range(self.requests)
+        ]
+
+    def post_delete(self):
+        posts = Post.objects.bulk_create([
+            Post(title=f'Doomed {i}', content='x', created_by=self.user) for i in range(self.requests)
+        ])
+        return [
+            ('delete', reverse('post_detail', args=[post.pk]), None, self.auth, 200)
+            for post in posts
+        ]
+
+    def comment_create(self):
+        post = Post.objects.order_by('-created_at').only('id').first()
+        return [
+            ('post', reverse('comments'), {'post': str(post.pk), 'content': f'Comment {i}'}, self.auth, 201)
+            for i in range(self.requests)
+        ]
+
+    def run(self, name):
+        requests = self.scenarios()[name]()
+        latencies = []
+        queries = []
+        start = time.perf_counter()
+        for i, (method, url, data, headers, expected) in enumerate(requests):
+            # Each request from its own client address, as from many
+            # clients, so the per-IP login throttle stays out of the way.
+            kwargs = {'headers': headers, 'REMOTE_ADDR': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'}
+            if method != 'get':
+                kwargs['content_type'] = 'application/json'
+            with CaptureQueriesContext(connection) as captured:
+                request_start = time.perf_counter()
+                response = getattr(self.client, method)(url, data, **kwargs)
+                latencies.append(time.perf_counter() - request_start)
+            queries.append(len(captured))
+            if response.status_code != expected:
+                raise AssertionError(f"{name}: {method.upper()} {url} returned {response.status_code}: {response.content[:200]!r}")
+        stats = summarize(latencies, time.perf_counter() - start)
+        stats['queries_per_request'] = sum(queries) / len(queries) if queries else 0.0
+        stats['max_queries'] = max(queries, default=0)
+        return stats
+
+
+def compare(baseline, current, tolerance=0.5):
+    """
+    Return human-readable regressions of `current` against `baseline`
+    (both {scenario: stats}): throughput down or p95 up by more than
+    `tolerance`, or any increase in queries per request.
+    """
+    regressions = []
+    for name, before in baseline.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        if after['rps'] < before['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {after['rps']:.1f} req/s, baseline {before['rps']:.1f}")
+        if after['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {after['p95_ms']:.1f} ms, baseline {before['p95_ms']:.1f}")
+        if after['max_queries'] > before['max_queries']:
+            regressions.append(f"{name}: {after['max_queries']} queries per request, baseline {before['max_queries']}")
+    return regressions
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from drf_yasg.codecs import OpenAPICodecJson
+
+from RBAC_Project.schema import API_INFO, SchemaView
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once, at build time, into API_SCHEMA_FILE (or --output), "
+        "so the docs views serve it without introspecting the views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', required=True, help="Base URL of the deployment, e.g. https://rbac-simple-app.vercel.app")
+        parser.add_argument('--output', default=None, help="Defaults to the API_SCHEMA_FILE setting.")
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.API_SCHEMA_FILE
+        if not output:
+            raise CommandError("Pass --output or set API_SCHEMA_FILE.")
+        generator = SchemaView.generator_class(API_INFO, url=options['url'])
+        schema = generator.get_schema(request=None, public=True)
+        with open(output, 'wb') as f:
+            f.write(OpenAPICodecJson(validators=[]).encode(schema))
+        self.stdout.write(f"Wrote the schema for {options['url']} to {output}")
@@ -0,0 +1,69 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from RBAC_Project.benchmarking import benchmark_database
+from RBAC_Project.loadtest import SCALES, LoadTest, compare, generate_fixtures
+
+SCENARIOS = (
+    'register', 'login', 'logout', 'post_list', 'post_list_pages',
+    'post_create', 'post_delete', 'comment_create',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test every endpoint against generated fixtures in a throwaway database. "
+        "Reports req/s, p50/p95/p99 and queries per request; saves or checks JSON baselines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='10k')
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+        parser.add_argument('--pbkdf2-iterations', type=int, default=1000,
+                            help="Hashing cost during the run, so login/register measure the app rather than PBKDF2.")
+        parser.add_argument('--save', metavar='PATH', help="Write the results as a JSON baseline.")
+        parser.add_argument('--compare', metavar='PATH', help="Fail if the results regress against this baseline.")
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help="Allowed relative drop in req/s or rise in p95 before --compare fails.")
+
+    def handle(self, *args, **options):
+        with benchmark_database(), override_settings(PASSWORD_PBKDF2_ITERATIONS=options['pbkdf2_iterations']):
+            start = time.perf_counter()
+            counts = generate_fixtures(SCALES[options['scale']])
+            self.stdout.write(
+                f"fixtures: {counts['users']} users, {counts['posts']} posts, {counts['comments']} comments "
+                f"in {time.perf_counter() - start:.1f} s"
+            )
+            loadtest = LoadTest(options['requests'])
+            results = {name: loadtest.run(name) for name in options['scenarios'].split(',')}
+
+        self.stdout.write(f"{'scenario':<16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<16} {stats['rps']:8.1f} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+                f"{stats['p99_ms']:8.2f} {stats['queries_per_request']:8.2f}"
+            )
+
+        if options['save']:
+            baseline = {
+                'scale': options['scale'],
+                'requests': options['requests'],
+                'pbkdf2_iterations': options['pbkdf2_iterations'],
+                'results': results,
+            }
+            with open(options['save'], 'w') as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(f"Saved baseline to {options['save']}")
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare(baseline['results'], results, options['tolerance'])
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
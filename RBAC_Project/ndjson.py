@@ -0,0 +1,58 @@
+"""
+Streaming NDJSON (newline-delimited JSON) input for bulk endpoints.
+"""
+
+import json
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+class InvalidLine:
+    """
+    Stands in for a line that could not be parsed, so bulk endpoints can
+    report it as a failed row and keep going.
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+    def __repr__(self):
+        return f'InvalidLine({self.message!r})'
+
+
+def iter_ndjson(stream, encoding='utf-8'):
+    """
+    Lazily parse `stream` one line at a time; blank lines are skipped.
+    Only the current line is ever held in memory.
+    """
+    for raw_line in iter(stream.readline, b''):
+        try:
+            line = raw_line.decode(encoding).strip()
+            if not line:
+                continue
+            yield json.loads(line)
+        except ValueError as exc:
+            yield InvalidLine(f'JSON parse error - {exc}')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses an `application/x-ndjson` body into a lazy iterator of rows
+    instead of a list, so request.data can be consumed as a stream.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if stream is None:
+            return iter(())
+        return iter_ndjson(stream, encoding)
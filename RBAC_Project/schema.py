@@ -0,0 +1,104 @@
+"""
+The OpenAPI schema and its redoc/swagger pages, served from memory.
+
+drf-yasg builds the schema by introspecting every view on each request.
+CachedSchemaView renders each variant (format and base URL) once per
+process and then answers from memory with a strong ETag, so repeated hits
+on the docs, and on `/` in particular, cost a dictionary lookup. When
+API_SCHEMA_FILE names a file written by `manage.py build_schema`, the
+JSON schema is read from it instead of being generated at all.
+"""
+
+import hashlib
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework.permissions import AllowAny
+
+API_INFO = openapi.Info(
+    title="RBAC_APP SYSTEMS API",
+    description="this is documentation for your rbac app",
+    default_version="v1",
+    contact=openapi.Contact(email="nikhilpatil18012004@gmail.com"),
+    license=openapi.License(name="ALL Right Reserved")
+)
+
+SchemaView = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(AllowAny,)
+)
+
+
+class RenderedSchema:
+    __slots__ = ('content', 'content_type', 'etag')
+
+    def __init__(self, content, content_type):
+        if isinstance(content, str):
+            content = content.encode()
+        self.content = content
+        self.content_type = content_type
+        self.etag = '"%s"' % hashlib.sha256(content).hexdigest()
+
+
+def load_schema_file(path):
+    """
+    The prebuilt JSON schema at `path`, or None if there is none.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return RenderedSchema(f.read(), 'application/json; charset=utf-8')
+    except FileNotFoundError:
+        return None
+
+
+class CachedSchemaView(SchemaView):
+    # (renderer format, version, base URL) -> RenderedSchema, shared by
+    # the redoc and swagger views of this process. Bounded, since a
+    # wildcard in ALLOWED_HOSTS admits any number of base URLs.
+    rendered = {}
+    max_entries = 64
+    _lock = threading.Lock()
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        key = (renderer.format, request.version or version or '', request.build_absolute_uri('/'))
+        entry = self.rendered.get(key)
+        if entry is None:
+            entry = self.render_schema(request, version, format)
+            with self._lock:
+                if len(self.rendered) < self.max_entries:
+                    entry = self.rendered.setdefault(key, entry)
+
+        response = get_conditional_response(request, etag=entry.etag)
+        if response is None:
+            response = HttpResponse(entry.content, content_type=entry.content_type)
+        response['ETag'] = entry.etag
+        # The schema only changes with a deploy: let clients keep it, but
+        # revalidate.
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def render_schema(self, request, version, format):
+        renderer = request.accepted_renderer
+        schema_file = getattr(settings, 'API_SCHEMA_FILE', None)
+        if schema_file and isinstance(renderer, (OpenAPIRenderer, SwaggerJSONRenderer)):
+            prebuilt = load_schema_file(schema_file)
+            if prebuilt is not None:
+                return prebuilt
+        response = super().get(request, version, format)
+        content = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        return RenderedSchema(content, content_type)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls.rendered.clear()
@@ -17,28 +17,17 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework.permissions import AllowAny
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-schema_view=get_schema_view(
-    openapi.Info(
-        title="RBAC_APP SYSTEMS API",
-        description="this is documentation for your rbac app",
-        default_version="v1",
-        contact=openapi.Contact(email="nikhilpatil18012004@gmail.com"),
-        license=openapi.License(name="ALL Right Reserved")
-        
-    ),
-    public=True,
-    permission_classes=(AllowAny,)
-)
+from .schema import CachedSchemaView
+from .views import DatabaseMetricsView, PrometheusMetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('user/', include('user_app.urls')),  # User app URLs
     path('blog/', include('blog_app.urls')),  # Blog app URLs
+    path('metrics/', PrometheusMetricsView.as_view(), name='metrics'),
+    path('metrics/database/', DatabaseMetricsView.as_view(), name='database_metrics'),
     
-    path('', schema_view.with_ui('redoc', cache_timeout=0), name="redoc_documentation"),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='swagger_documentation')
+    path('', CachedSchemaView.with_ui('redoc'), name="redoc_documentation"),
+    path('swagger/', CachedSchemaView.with_ui('swagger'), name='swagger_documentation')
 ]
@@ -0,0 +1,134 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from user_app.permissions import RolePermission
+from user_app.throttling import login_throttle
+from .dbmetrics import database_metrics
+from .instrumentation import registry
+
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+
+class DatabaseMetricsView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {
+        'GET': 'system.metrics',
+    }
+
+    @swagger_auto_schema(
+        operation_id="Database Metrics",
+        operation_description="Connection reuse, acquire time and pool metrics of the serving process (admin only).",
+        responses={
+            200: openapi.Response(
+                description="Metrics of this process.",
+                examples={
+                    "application/json": {
+                        "mode": "pool",
+                        "conn_max_age": 0,
+                        "conn_health_checks": False,
+                        "connections": {
+                            "acquired": 1204,
+                            "acquire_seconds_total": 3.1,
+                            "acquire_p50_ms": 0.4,
+                            "acquire_p99_ms": 21.7,
+                            "health_check_failures": 0
+                        },
+                        "pool": {
+                            "pool_min": 2,
+                            "pool_max": 10,
+                            "pool_size": 4,
+                            "pool_available": 3,
+                            "requests_waiting": 0,
+                            "requests_wait_ms": 212
+                        }
+                    }
+                }
+            ),
+            403: openapi.Response(
+                description="Your role does not allow this action."
+            ),
+        }
+    )
+    def get(self, request):
+        try:
+            return Response(database_metrics(), status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"message": f"Error reading metrics: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MetricsScraper:
+    """
+    The user of a request authenticated with METRICS_SCRAPE_TOKEN.
+    """
+    is_authenticated = True
+    role = None
+    pk = None
+
+
+class ScrapeTokenAuthentication(BaseAuthentication):
+    """
+    Accepts `Authorization: Bearer <METRICS_SCRAPE_TOKEN>`, a static token
+    a Prometheus scraper can be configured with; access tokens expire
+    after 30 minutes and can't be refreshed unattended. Any other
+    credentials are left to the next authentication class.
+    """
+
+    def authenticate(self, request):
+        expected = getattr(settings, 'METRICS_SCRAPE_TOKEN', None)
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if not expected or scheme.lower() != 'bearer':
+            return None
+        if not hmac.compare_digest(token.strip().encode(), expected.encode()):
+            return None
+        return MetricsScraper(), None
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
+
+
+class IsMetricsScraper(BasePermission):
+    def has_permission(self, request, view):
+        return isinstance(request.user, MetricsScraper)
+
+
+class PrometheusMetricsView(APIView):
+    authentication_classes = [ScrapeTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [IsMetricsScraper | (IsAuthenticated & RolePermission)]
+    required_permissions = {
+        'GET': 'system.metrics',
+    }
+
+    @swagger_auto_schema(
+        operation_id="Request Metrics",
+        operation_description=(
+            "Per-view request, query and render timings of the sampled requests of the serving process, "
+            "and its login throttle counters, in the Prometheus text format. Scrapers authenticate with "
+            "the static METRICS_SCRAPE_TOKEN as a bearer token; admins may also use their access token."
+        ),
+        responses={
+            200: openapi.Response(
+                description="Metrics of this process.",
+                examples={
+                    "text/plain": 'rbac_request_duration_seconds_count{view="PostView.get"} 120\n'
+                                  'rbac_db_queries_total{view="PostView.get"} 240\n'
+                }
+            ),
+            403: openapi.Response(
+                description="Your role does not allow this action."
+            ),
+        }
+    )
+    def get(self, request):
+        try:
+            return HttpResponse(registry.render_prometheus() + login_throttle.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+        except Exception as e:
+            return Response({"message": f"Error reading metrics: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
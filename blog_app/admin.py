@@ -2,6 +2,15 @@ from django.contrib import admin
 
 from .models import Post, Comment
 
-admin.site.register(Post)
-admin.site.register(Comment)
-# Register your models here.
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    list_display = ('title', 'created_by', 'created_at')
+    list_select_related = ('created_by',)
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'created_at')
+    # Comment.__str__ reads created_by.email and post.title.
+    list_select_related = ('created_by', 'post')
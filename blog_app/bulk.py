@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from RBAC_Project.ndjson import InvalidLine, chunked
+from .cache import post_list_cache
+from .counters import count_created
+from .models import Post, Comment
+from .search import index_objects, search_vector
+from .serializers import PostSerializer, BulkCommentSerializer
+
+
+class BulkIngest:
+    """
+    Inserts rows from an iterable (typically a lazily parsed NDJSON body)
+    in batches of `batch_size`, one bulk_create and transaction per batch.
+
+    Only counters and the first `max_errors` failures are kept, so memory
+    stays bounded by the batch size however long the upload is.
+    """
+    model = None
+    serializer_class = None
+
+    def __init__(self, user, batch_size=None, max_errors=None):
+        self.user = user
+        self.batch_size = batch_size or settings.BLOG_BULK_BATCH_SIZE
+        self.max_errors = max_errors or settings.BLOG_BULK_MAX_ERRORS
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def run(self, rows):
+        for batch in chunked(enumerate(rows), self.batch_size):
+            self.process_batch(batch)
+        return self
+
+    def validate(self, batch):
+        valid = []
+        for row, data in batch:
+            if isinstance(data, InvalidLine):
+                self.fail(row, {'non_field_errors': [data.message]})
+                continue
+            if not isinstance(data, dict):
+                self.fail(row, {'non_field_errors': ['Expected a JSON object.']})
+                continue
+            serializer = self.serializer_class(data=data)
+            if not serializer.is_valid():
+                self.fail(row, serializer.errors)
+                continue
+            valid.append((row, serializer.validated_data))
+        return valid
+
+    def check_batch(self, valid):
+        """
+        Hook for checks that need one query per batch rather than per row.
+        """
+        return valid
+
+    def build(self, data):
+        obj = self.model(created_by_id=self.user.pk, **data)
+        obj.search_vector = search_vector(obj)
+        return obj
+
+    def process_batch(self, batch):
+        valid = self.check_batch(self.validate(batch))
+        if not valid:
+            return
+        objs = [self.build(data) for _, data in valid]
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(objs)
+                count_created(objs)
+            self.created += len(objs)
+            # bulk_create sends no post_save signals.
+            index_objects(objs)
+        except IntegrityError:
+            self.insert_one_by_one(valid, objs)
+        post_list_cache.invalidate()
+
+    def insert_one_by_one(self, valid, objs):
+        with transaction.atomic():
+            saved = []
+            for (row, _), obj in zip(valid, objs):
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                except IntegrityError as e:
+                    self.fail(row, {'non_field_errors': [str(e)]})
+                    continue
+                saved.append(obj)
+            count_created(saved)
+            self.created += len(saved)
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+class PostIngest(BulkIngest):
+    model = Post
+    serializer_class = PostSerializer
+
+
+class CommentIngest(BulkIngest):
+    model = Comment
+    serializer_class = BulkCommentSerializer
+
+    def check_batch(self, valid):
+        post_ids = {data['post'] for _, data in valid}
+        existing = set(Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True))
+        checked = []
+        for row, data in valid:
+            if data['post'] not in existing:
+                self.fail(row, {'post': [f'Invalid pk "{data["post"]}" - object does not exist.']})
+                continue
+            checked.append((row, data))
+        return checked
+
+    def build(self, data):
+        data = dict(data)
+        obj = self.model(post_id=data.pop('post'), created_by_id=self.user.pk, **data)
+        obj.search_vector = search_vector(obj)
+        return obj
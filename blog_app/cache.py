@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LocalLRUCache:
+    """
+    Small thread-safe in-process LRU cache whose entries expire after `ttl`
+    seconds.
+    """
+
+    def __init__(self, maxsize=256, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ReadThroughCache:
+    """
+    Two-tier versioned read-through cache.
+
+    Lookups go to the local LRU tier first, then to the shared tier (a
+    Django cache alias every process can reach, e.g. Redis), and only then
+    to the loader. Every key embeds a version number kept in the shared
+    tier, so invalidate() makes all cached entries unreachable in every
+    process at once; stale entries simply age out.
+
+    Without a shared tier the version is per process: invalidate() only
+    reaches the calling process, and the others serve their local entries
+    until they expire. A per-process cache such as LocMem must not be used
+    as the shared tier, since it would behave the same way for up to
+    `shared_ttl`.
+    """
+
+    def __init__(self, namespace, enabled=True, local_maxsize=256, local_ttl=30,
+                 shared_alias=None, shared_ttl=300):
+        self.namespace = namespace
+        self.enabled = enabled
+        self.local = LocalLRUCache(local_maxsize, local_ttl)
+        self.shared_alias = shared_alias
+        self.shared_ttl = shared_ttl
+        self._local_version = 1
+        self._lock = threading.Lock()
+        self.hits_local = 0
+        self.hits_shared = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, namespace, setting_name):
+        options = getattr(settings, setting_name, {})
+        return cls(
+            namespace,
+            enabled=options.get('ENABLED', True),
+            local_maxsize=options.get('LOCAL_MAXSIZE', 256),
+            local_ttl=options.get('LOCAL_TTL', 30),
+            shared_alias=options.get('SHARED_ALIAS'),
+            shared_ttl=options.get('SHARED_TTL', 300),
+        )
+
+    @property
+    def shared(self):
+        if self.shared_alias is None:
+            return None
+        return caches[self.shared_alias]
+
+    @property
+    def version_key(self):
+        return f'{self.namespace}:version'
+
+    def get_version(self):
+        shared = self.shared
+        if shared is None:
+            return self._local_version
+        version = shared.get(self.version_key)
+        if version is None:
+            shared.add(self.version_key, 1, timeout=None)
+            version = shared.get(self.version_key, 1)
+        return version
+
+    def invalidate(self):
+        with self._lock:
+            self._local_version += 1
+        shared = self.shared
+        if shared is not None:
+            shared.add(self.version_key, 1, timeout=None)
+            try:
+                shared.incr(self.version_key)
+            except ValueError:
+                # The key was evicted between add() and incr().
+                shared.set(self.version_key, self._local_version, timeout=None)
+
+    def get_or_load(self, variant, loader, cacheable=None):
+        """
+        The cached value for `variant`, loading it on a miss. A loaded value
+        for which `cacheable(value)` is false is returned but not stored.
+        """
+        if not self.enabled:
+            return loader()
+
+        key = f'{self.namespace}:{self.get_version()}:{variant}'
+        value = self.local.get(key)
+        if value is not None:
+            self.hits_local += 1
+            return value
+
+        shared = self.shared
+        if shared is not None:
+            value = shared.get(key)
+            if value is not None:
+                self.hits_shared += 1
+                self.local.set(key, value)
+                return value
+
+        self.misses += 1
+        value = loader()
+        if cacheable is not None and not cacheable(value):
+            return value
+        self.local.set(key, value)
+        if shared is not None:
+            shared.set(key, value, timeout=self.shared_ttl)
+        return value
+
+    async def aget_version(self):
+        shared = self.shared
+        if shared is None:
+            return self._local_version
+        version = await shared.aget(self.version_key)
+        if version is None:
+            await shared.aadd(self.version_key, 1, timeout=None)
+            version = await shared.aget(self.version_key, 1)
+        return version
+
+    async def aget_or_load(self, variant, loader, cacheable=None):
+        """
+        Async get_or_load(); `loader` is a coroutine function.
+        """
+        if not self.enabled:
+            return await loader()
+
+        key = f'{self.namespace}:{await self.aget_version()}:{variant}'
+        value = self.local.get(key)
+        if value is not None:
+            self.hits_local += 1
+            return value
+
+        shared = self.shared
+        if shared is not None:
+            value = await shared.aget(key)
+            if value is not None:
+                self.hits_shared += 1
+                self.local.set(key, value)
+                return value
+
+        self.misses += 1
+        value = await loader()
+        if cacheable is not None and not cacheable(value):
+            return value
+        self.local.set(key, value)
+        if shared is not None:
+            await shared.aset(key, value, timeout=self.shared_ttl)
+        return value
+
+    def clear(self):
+        self.local.clear()
+        self.invalidate()
+
+    def stats(self):
+        return {
+            'hits_local': self.hits_local,
+            'hits_shared': self.hits_shared,
+            'misses': self.misses,
+            'local_size': len(self.local),
+        }
+
+
+post_list_cache = ReadThroughCache.from_settings('blog:posts', 'BLOG_POST_CACHE')
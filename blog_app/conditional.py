@@ -0,0 +1,51 @@
+"""
+Conditional GET for the post list.
+
+The ETag is a digest of the page itself, computed once when the page is
+loaded into post_list_cache and kept next to it, so an unchanged poll is
+answered with 304 Not Modified without serializing anything again. Being
+derived from the content, it changes with anything that shows in the
+list (a new, deleted or edited post, a new comment, an author's new
+email) as soon as the cached page does. There is no Last-Modified: no
+timestamp covers deletions and edits.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from RBAC_Project.fastjson import dumps
+
+
+def cached_page(data):
+    """
+    What post_list_cache keeps for a page: its data and their digest.
+    """
+    return data, hashlib.md5(dumps(data), usedforsecurity=False).hexdigest()
+
+
+class ListValidators:
+    """
+    ETag of a post list page with data digest `digest` as rendered for
+    `request`.
+    """
+
+    def __init__(self, request, digest):
+        renderer = getattr(request, 'accepted_renderer', None)
+        key = f"{digest}|{getattr(renderer, 'format', '')}"
+        self.etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    def not_modified(self, request):
+        """
+        A 304 response if the client's copy is current, else None.
+        """
+        response = get_conditional_response(request, etag=self.etag)
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        # Authenticated content: browsers may keep it, but must revalidate.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,108 @@
+"""
+Denormalized counters: User.post_count and Post.comment_count.
+
+Every write path adjusts them with an F() update in the same transaction
+as the insert or delete, so the database does the arithmetic and
+concurrent writers never lose an increment. `manage.py reconcile_counters`
+recomputes them from the rows, batch by batch, in case they drift (rows
+changed outside these paths, e.g. in the admin).
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from user_app.models import User
+from .models import Post, Comment
+
+# Counter column -> (model holding it, counted model, foreign key to it).
+COUNTERS = {
+    'post_count': (User, Post, 'created_by'),
+    'comment_count': (Post, Comment, 'post'),
+}
+
+
+def adjust(model, field, counts):
+    """
+    Add counts[pk] to `field` of each row: one UPDATE per distinct delta.
+    Decrements stop at zero, so a counter that has drifted low cannot
+    fail the write it belongs to.
+    """
+    by_delta = defaultdict(list)
+    for pk, delta in counts.items():
+        if delta:
+            by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        value = F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        model.objects.filter(pk__in=pks).update(**{field: value})
+
+
+def create_post(user, data):
+    with transaction.atomic():
+        post = Post.objects.create(created_by=user, **data)
+        adjust(User, 'post_count', {user.pk: 1})
+    return post
+
+
+def delete_post(post):
+    """
+    Delete `post`, counting it off its author only if this call removed
+    the row: a post deleted twice concurrently is decremented once.
+    """
+    with transaction.atomic():
+        _, deleted = post.delete()
+        if deleted.get(Post._meta.label):
+            adjust(User, 'post_count', {post.created_by_id: -1})
+
+
+def create_comment(user, **fields):
+    with transaction.atomic():
+        comment = Comment.objects.create(created_by=user, **fields)
+        adjust(Post, 'comment_count', {comment.post_id: 1})
+    return comment
+
+
+def count_created(objs):
+    """
+    Counter updates for rows inserted with bulk_create.
+    """
+    if not objs:
+        return
+    if isinstance(objs[0], Post):
+        adjust(User, 'post_count', Counter(obj.created_by_id for obj in objs))
+    else:
+        adjust(Post, 'comment_count', Counter(obj.post_id for obj in objs))
+
+
+def reconcile(field, batch_size=1000):
+    """
+    Recompute `field` for every row, `batch_size` rows at a time, walking
+    the primary key. Returns the number of rows that were wrong.
+    """
+    model, counted, foreign_key = COUNTERS[field]
+    fixed = 0
+    last_pk = None
+    while True:
+        rows = model.objects.order_by('pk')
+        if last_pk is not None:
+            rows = rows.filter(pk__gt=last_pk)
+        batch = list(rows.values_list('pk', field)[:batch_size])
+        if not batch:
+            return fixed
+        last_pk = batch[-1][0]
+        actual = dict(
+            counted.objects.filter(**{f'{foreign_key}__in': [pk for pk, _ in batch]})
+            .order_by().values_list(foreign_key).annotate(count=Count('pk'))
+        )
+        wrong = [pk for pk, stored in batch if stored != actual.get(pk, 0)]
+        if wrong:
+            # Recount in the UPDATE itself rather than writing the numbers
+            # read above, so writes made meanwhile are not lost.
+            live_count = Subquery(
+                counted.objects.filter(**{foreign_key: OuterRef('pk')}).order_by()
+                .values(foreign_key).annotate(count=Count('pk')).values('count')
+            )
+            model.objects.filter(pk__in=wrong).update(**{field: Coalesce(live_count, 0)})
+            fixed += len(wrong)
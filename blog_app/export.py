@@ -0,0 +1,118 @@
+import csv
+import datetime
+import json
+import uuid
+import zlib
+
+from django.core.exceptions import ValidationError
+
+from .filters import author_condition, parse_bound
+from .models import Post, Comment
+
+EXPORTS = {
+    'posts': (Post, ['id', 'title', 'content', 'created_by', 'created_at', 'comment_count']),
+    'comments': (Comment, ['id', 'post', 'content', 'created_by', 'created_at']),
+}
+
+OUTPUTS = ('ndjson', 'csv')
+
+
+class InvalidExport(ValueError):
+    pass
+
+
+def export_rows(kind, since=None, until=None, author=None, chunk_size=2000):
+    """
+    Yield value tuples for `kind` through a server-side cursor, so only
+    `chunk_size` rows are in memory at a time. `since` and `until` are
+    parsed with parse_bound(), `author` is an id or email.
+    """
+    if kind not in EXPORTS:
+        raise InvalidExport(f"Unknown export: {kind}")
+    model, fields = EXPORTS[kind]
+    queryset = model.objects.all()
+    try:
+        since = parse_bound(since)
+        until = parse_bound(until, end=True)
+    except ValidationError as e:
+        raise InvalidExport(e.message)
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    if until:
+        queryset = queryset.filter(created_at__lte=until)
+    if author:
+        queryset = queryset.filter(author_condition(author))
+    columns = [
+        'created_by__email' if field == 'created_by' else field
+        for field in fields
+    ]
+    return fields, queryset.order_by('created_at', 'id').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def _format(value):
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def ndjson_lines(fields, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, map(_format, row))), ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_format(value) for value in row])
+
+
+def encode(lines, buffer_size=65536):
+    """
+    Join lines into ~buffer_size byte chunks, so the response isn't made of
+    one tiny write per row.
+    """
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(kind, output='ndjson', compress=False, **filters):
+    """
+    Return a generator of byte chunks for the export. Memory use does not
+    depend on the number of rows.
+    """
+    if output not in OUTPUTS:
+        raise InvalidExport(f"Unknown output: {output}")
+    fields, rows = export_rows(kind, **filters)
+    lines = ndjson_lines(fields, rows) if output == 'ndjson' else csv_lines(fields, rows)
+    chunks = encode(lines)
+    return gzip_chunks(chunks) if compress else chunks
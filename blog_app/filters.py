@@ -0,0 +1,84 @@
+"""
+Filters for the post list: `created_by` (author id or email), `since` and
+`until` (ISO datetimes, or dates meaning the start or end of that day in
+UTC) and `role` (the author's role).
+
+Every combination runs on an index: author filters on
+post_author_created_at_idx (created_by_id, created_at, id), which also
+yields rows in page order; time windows alone on post_created_at_id_idx;
+`role` goes through the index on User.role. PostFilterTests checks this
+with EXPLAIN.
+"""
+
+import datetime
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from user_app.models import User
+
+FILTER_PARAMS = ('created_by', 'since', 'until', 'role')
+
+ROLES = {value for value, _ in User._meta.get_field('role').choices}
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def parse_bound(value, end=False):
+    """
+    Parse a `since`/`until` bound: an ISO datetime, or a date meaning the
+    start (or, for `until`, the end) of that day in UTC. Raises
+    ValidationError if it is neither.
+    """
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError(f"Invalid date: {value}")
+        moment = datetime.datetime.combine(day, datetime.time.max if end else datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, datetime.timezone.utc)
+    return moment
+
+
+def author_condition(author):
+    """
+    The Q object selecting rows created by `author`, a user id or email.
+    """
+    try:
+        return Q(created_by_id=uuid.UUID(author))
+    except ValueError:
+        return Q(created_by__email=author)
+
+
+def post_filter(params):
+    """
+    The Q object for the filters in `params` (a QueryDict or dict).
+    Raises InvalidFilter on values that can't be parsed.
+    """
+    condition = Q()
+    created_by = params.get('created_by')
+    if created_by:
+        condition &= author_condition(created_by)
+    try:
+        since = parse_bound(params.get('since'))
+        until = parse_bound(params.get('until'), end=True)
+    except ValidationError as e:
+        raise InvalidFilter(e.message)
+    if since:
+        condition &= Q(created_at__gte=since)
+    if until:
+        condition &= Q(created_at__lte=until)
+    role = params.get('role')
+    if role:
+        if role not in ROLES:
+            raise InvalidFilter(f"Invalid role: {role}")
+        condition &= Q(created_by_id__in=User.objects.filter(role=role).values('pk'))
+    return condition
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import path
+
+from RBAC_Project.benchmarking import benchmark_database, summarize
+from blog_app.cache import post_list_cache
+from blog_app.models import Post
+from blog_app.views import AsyncCommentView, AsyncPostView, CommentView, PostView
+from user_app.hashing import hash_password
+from user_app.models import User
+from user_app.tokens import RBACRefreshToken
+from user_app.views import AsyncLoginView, LoginView
+
+# Both variants side by side, so one process can serve either path.
+urlpatterns = [
+    path('wsgi/posts/', PostView.as_view()),
+    path('wsgi/comments/', CommentView.as_view()),
+    path('wsgi/login/', LoginView.as_view()),
+    path('asgi/posts/', AsyncPostView.as_view()),
+    path('asgi/comments/', AsyncCommentView.as_view()),
+    path('asgi/login/', AsyncLoginView.as_view()),
+]
+
+SCENARIOS = ('posts', 'comments', 'login')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync views served through the WSGI handler with the async views served "
+        "through the ASGI handler, with an artificial per-query database round-trip time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=4, help="WSGI worker threads.")
+        parser.add_argument('--concurrency', type=int, default=64, help="Requests in flight on the ASGI event loop.")
+        parser.add_argument('--latency', type=float, default=20.0, help="Milliseconds added to every query.")
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        with benchmark_database(), override_settings(ROOT_URLCONF=__name__, PASSWORD_PBKDF2_ITERATIONS=1000):
+            latency = options['latency'] / 1000
+
+            def slow_round_trip(execute, sql, params, many, context):
+                time.sleep(latency)
+                return execute(sql, params, many, context)
+
+            def add_latency(sender, connection, **kwargs):
+                connection.execute_wrappers.append(slow_round_trip)
+
+            # Every thread has its own connection; the ASGI path opens one
+            # per request.
+            connection_created.connect(add_latency, weak=False)
+            connection.execute_wrappers.append(slow_round_trip)
+            enabled, post_list_cache.enabled = post_list_cache.enabled, False
+            try:
+                self.run(options)
+            finally:
+                post_list_cache.enabled = enabled
+                connection.execute_wrappers.remove(slow_round_trip)
+                connection_created.disconnect(add_latency)
+
+    def run(self, options):
+        password = 'bench-password-123'
+        user = User.objects.create(email='bench@example.com', username='bench', password=hash_password(password), role='admin')
+        post = Post.objects.create(title='Bench', content='Benchmark post.', created_by=user)
+        Post.objects.bulk_create([Post(title=f'Post {i}', content='body', created_by=user) for i in range(49)])
+        token = str(RBACRefreshToken.for_user(user).access_token)
+
+        requests = {
+            'posts': ('GET', 'posts/', None),
+            'comments': ('POST', 'comments/', {'post': str(post.pk), 'content': 'Benchmark comment.'}),
+            'login': ('POST', 'login/', {'email': user.email, 'password': password}),
+        }
+        results = {}
+        for scenario in options['scenarios'].split(','):
+            method, url, data = requests[scenario]
+            body = json.dumps(data).encode() if data is not None else b''
+            results[scenario] = {
+                'wsgi': self.run_wsgi(method, f'/wsgi/{url}', body, token, options),
+                'asgi': asyncio.run(self.run_asgi(method, f'/asgi/{url}', body, token, options)),
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{options['requests']} requests per run, {options['latency']:.1f} ms per query, "
+            f"WSGI: {options['workers']} threads, ASGI: {options['concurrency']} in flight"
+        )
+        for scenario, paths in results.items():
+            for name, stats in paths.items():
+                self.stdout.write(
+                    f"{scenario:<9} {name}: {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.1f} ms  "
+                    f"p95 {stats['p95_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms"
+                )
+
+    def run_wsgi(self, method, url, body, token, options):
+        def call(_):
+            client = Client(headers={'Authorization': f'Bearer {token}'})
+            start = time.perf_counter()
+            if method == 'GET':
+                response = client.get(url)
+            else:
+                response = client.post(url, body, content_type='application/json')
+            elapsed = time.perf_counter() - start
+            assert response.status_code < 300, response.content
+            return elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            latencies = list(executor.map(call, range(options['requests'])))
+        return summarize(latencies, time.perf_counter() - start)
+
+    async def run_asgi(self, method, url, body, token, options):
+        application = ASGIHandler()
+        slots = asyncio.Semaphore(options['concurrency'])
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': url,
+            'raw_path': url.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'authorization', f'Bearer {token}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+
+        async def call():
+            messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+            responses = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # No disconnect: wait until the handler cancels us.
+                await asyncio.Event().wait()
+
+            async def send(message):
+                responses.append(message)
+
+            async with slots:
+                start = time.perf_counter()
+                await application(dict(scope), receive, send)
+                elapsed = time.perf_counter() - start
+            status = responses[0]['status']
+            assert status < 300, responses
+            return elapsed
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(call() for _ in range(options['requests'])))
+        return summarize(latencies, time.perf_counter() - start)
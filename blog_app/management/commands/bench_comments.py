@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import path
+
+from RBAC_Project.benchmarking import benchmark_database, call_wsgi, summarize
+from blog_app import views
+from blog_app.cache import post_list_cache
+from blog_app.models import Comment, Post
+from blog_app.writebehind import MODES, CommentWriter
+from user_app.models import User
+from user_app.tokens import RBACRefreshToken
+
+urlpatterns = [
+    path('comments/', views.CommentView.as_view()),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Post bursts of comments at a fixed rate through CommentView in each COMMENT_WRITE_BEHIND mode, "
+        "with an artificial round-trip time per statement and commit; reports throughput, latency and commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--rate', type=float, default=1000, help="Comments per second offered by all clients together.")
+        parser.add_argument('--clients', type=int, default=16, help="Client threads.")
+        parser.add_argument('--latency', type=float, default=2.0, help="Milliseconds added to every query and commit.")
+        parser.add_argument('--modes', default=','.join(MODES))
+
+    def handle(self, *args, **options):
+        latency = options['latency'] / 1000
+        self.statements = 0
+        self.commits = 0
+
+        def remote_round_trip(execute, sql, params, many, context):
+            time.sleep(latency)
+            self.statements += 1
+            return execute(sql, params, many, context)
+
+        def remote(connection):
+            commit = connection.commit
+
+            def remote_commit():
+                time.sleep(latency)
+                self.commits += 1
+                commit()
+
+            connection.execute_wrappers.append(remote_round_trip)
+            connection.commit = remote_commit
+
+        def add_latency(sender, connection, **kwargs):
+            remote(connection)
+
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # Concurrent writers to a shared in-memory SQLite database fail
+            # with "table is locked" instead of waiting on busy_timeout.
+            test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'bench_comments.sqlite3')
+        with benchmark_database(), override_settings(ROOT_URLCONF=__name__):
+            # Every client thread, and the writer's, has its own connection.
+            connection_created.connect(add_latency, weak=False)
+            remote(connection)
+            enabled, post_list_cache.enabled = post_list_cache.enabled, False
+            try:
+                self.run(options)
+            finally:
+                post_list_cache.enabled = enabled
+                connection_created.disconnect(add_latency)
+                connection.execute_wrappers.remove(remote_round_trip)
+                del connection.commit
+
+    def run(self, options):
+        user = User.objects.create(email='bench@example.com', username='bench', role='admin')
+        post = Post.objects.create(title='Bench', content='Benchmark post.', created_by=user)
+        headers = {'Authorization': f'Bearer {RBACRefreshToken.for_user(user).access_token}'}
+        body = json.dumps({'post': str(post.pk), 'content': 'Benchmark comment.'}).encode()
+        handler = WSGIHandler()
+
+        self.stdout.write(
+            f"{options['comments']} comments offered at {options['rate']:.0f}/s by {options['clients']} clients, "
+            f"{options['latency']:.1f} ms per statement and commit"
+        )
+        self.stdout.write(f"{'mode':6}{'comments/s':>12}{'p50 ms':>9}{'p99 ms':>9}{'commits':>9}{'statements':>12}")
+        for mode in options['modes'].split(','):
+            Comment.objects.all().delete()
+            writer = CommentWriter(mode=mode)
+            views.comment_writer, previous = writer, views.comment_writer
+            self.statements = self.commits = 0
+            latencies = []
+            statuses = []
+            interval = options['clients'] / options['rate']
+
+            def client(n):
+                next_at = time.perf_counter()
+                for _ in range(n, options['comments'], options['clients']):
+                    time.sleep(max(0.0, next_at - time.perf_counter()))
+                    start = time.perf_counter()
+                    status = call_wsgi(handler, 'POST', '/comments/', body=body, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    statuses.append(status)
+                    next_at += interval
+
+            try:
+                start = time.perf_counter()
+                threads = [threading.Thread(target=client, args=(n,)) for n in range(options['clients'])]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # Throughput counts until the last comment is stored.
+                while writer.written + writer.failed < writer.queued:
+                    time.sleep(0.001)
+                elapsed = time.perf_counter() - start
+            finally:
+                views.comment_writer = previous
+
+            stored = Comment.objects.count()
+            failed = len(statuses) - statuses.count(201) - statuses.count(202)
+            assert stored == options['comments'], f"{mode}: {stored} stored, {failed} requests failed ({set(statuses)})"
+            stats = summarize(latencies, elapsed)
+            self.stdout.write(
+                f"{mode:6}{stats['rps']:12.1f}{stats['p50_ms']:9.1f}{stats['p99_ms']:9.1f}"
+                f"{self.commits:9}{self.statements:12}"
+            )
@@ -0,0 +1,143 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import reverse
+
+from RBAC_Project.benchmarking import benchmark_database, call_wsgi, summarize
+from blog_app.cache import post_list_cache
+from blog_app.models import Post
+from user_app.models import User
+from user_app.tokens import RBACRefreshToken
+
+MODES = ('none', 'persistent', 'pool')
+
+
+@contextmanager
+def handshake_delay(seconds):
+    """
+    Add `seconds` to every new connection, standing in for the TCP, TLS
+    and auth round trips to a remote server.
+    """
+    wrapper_class = type(connections['default'])
+    get_new_connection = wrapper_class.get_new_connection
+
+    def slow_get_new_connection(self, conn_params):
+        time.sleep(seconds)
+        return get_new_connection(self, conn_params)
+
+    wrapper_class.get_new_connection = slow_get_new_connection
+    try:
+        yield
+    finally:
+        wrapper_class.get_new_connection = get_new_connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the post list under each DB_CONNECTION_MODE against the configured database "
+        "(ideally a local PostgreSQL), with a simulated connection handshake cost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--handshake-ms', type=float, default=30.0,
+                            help="Extra milliseconds per new connection; 0 against a real remote server.")
+        parser.add_argument('--modes', default=','.join(MODES))
+
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # An in-memory SQLite database is never reconnected to.
+            test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'bench_connections.sqlite3')
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        user = User.objects.create(email='bench@example.com', username='bench')
+        Post.objects.bulk_create([Post(title=f'Post {i}', content='body', created_by=user) for i in range(100)])
+        token = str(RBACRefreshToken.for_user(user).access_token)
+        url = reverse('posts')
+
+        opened = []
+        connection_created.connect(lambda **kwargs: opened.append(1), weak=False, dispatch_uid='bench_connections')
+        enabled, post_list_cache.enabled = post_list_cache.enabled, False
+        settings_dict = connection.settings_dict
+        original = dict(settings_dict), dict(settings_dict['OPTIONS'])
+        self.stdout.write(
+            f"{options['requests']} requests, {options['workers']} workers, "
+            f"{options['handshake_ms']:.0f} ms handshake, {connection.vendor}"
+        )
+        try:
+            with handshake_delay(options['handshake_ms'] / 1000):
+                for mode in options['modes'].split(','):
+                    if not self.configure(mode, settings_dict):
+                        continue
+                    opened.clear()
+                    stats = self.drive(url, token, options)
+                    self.stdout.write(
+                        f"{mode:<11} {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.1f} ms  "
+                        f"p95 {stats['p95_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  "
+                        f"{len(opened)} connections opened"
+                    )
+                    if mode == 'pool':
+                        connection.close_pool()
+        finally:
+            settings_dict.clear()
+            settings_dict.update(original[0])
+            settings_dict['OPTIONS'] = original[1]
+            post_list_cache.enabled = enabled
+            connection_created.disconnect(dispatch_uid='bench_connections')
+
+    def configure(self, mode, settings_dict):
+        settings_dict['OPTIONS'].pop('pool', None)
+        settings_dict['CONN_HEALTH_CHECKS'] = mode == 'persistent'
+        settings_dict['CONN_MAX_AGE'] = 600 if mode == 'persistent' else 0
+        if mode == 'pool':
+            if connection.vendor != 'postgresql':
+                self.stdout.write("pool        skipped: needs PostgreSQL with psycopg 3")
+                return False
+            settings_dict['OPTIONS']['pool'] = {'min_size': 1, 'max_size': 4}
+        return True
+
+    def drive(self, url, token, options):
+        """
+        Send the requests through the WSGI handler from `workers` threads,
+        each with its own connection, like a threaded WSGI server.
+        """
+        pending = queue.SimpleQueue()
+        for i in range(options['requests']):
+            pending.put(i)
+        latencies = []
+        handler = WSGIHandler()
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    start = time.perf_counter()
+                    status = call_wsgi(handler, 'GET', url, 'page_size=20', headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    assert status == 200, status
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['workers'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(latencies, time.perf_counter() - start)
@@ -0,0 +1,75 @@
+import io
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from RBAC_Project.benchmarking import benchmark_database
+from RBAC_Project.fastjson import FastJSONParser, FastJSONRenderer, orjson
+from blog_app.models import Post
+from blog_app.serializers import PostSerializer
+from user_app.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer/JSONParser with the orjson-backed ones on post list pages, in MB/s."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100, help="Posts per page.")
+        parser.add_argument('--seconds', type=float, default=2.0, help="Time spent on each measurement.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write("orjson is not installed; FastJSONRenderer falls back to JSONRenderer.")
+        with benchmark_database():
+            page = self.page(options['posts'])
+        # The same page as PostView.get renders it, and with the raw UUIDs
+        # and datetimes a .values() query would give.
+        pages = {
+            'serialized': page,
+            'raw values': {
+                'next': page['next'],
+                'results': [
+                    {**row, 'id': uuid.UUID(row['id']), 'created_at': timezone.now() - timedelta(minutes=i)}
+                    for i, row in enumerate(page['results'])
+                ],
+            },
+        }
+        renderers = {'JSONRenderer': JSONRenderer(), 'FastJSONRenderer': FastJSONRenderer()}
+        parsers = {'JSONParser': JSONParser(), 'FastJSONParser': FastJSONParser()}
+        seconds = options['seconds']
+
+        for name, data in pages.items():
+            for renderer_name, renderer in renderers.items():
+                size = len(renderer.render(data))
+                rate = size * self.measure(lambda: renderer.render(data), seconds)
+                self.stdout.write(f"render {name:<11} {renderer_name:<17} {size:7d} bytes  {rate / 1e6:8.1f} MB/s")
+
+        body = renderers['JSONRenderer'].render(page)
+        for parser_name, parser in parsers.items():
+            rate = len(body) * self.measure(lambda: parser.parse(io.BytesIO(body)), seconds)
+            self.stdout.write(f"parse  {'page':<11} {parser_name:<17} {len(body):7d} bytes  {rate / 1e6:8.1f} MB/s")
+
+    def page(self, count):
+        user = User.objects.create(email='bench@example.com', username='bench')
+        Post.objects.bulk_create([
+            Post(title=f'Post {i}', content='Benchmark post body. ' * 20, created_by=user) for i in range(count)
+        ])
+        posts = Post.objects.select_related('created_by').order_by('-created_at')
+        return {'next': 'http://testserver/blog/posts/?cursor=abc', 'results': PostSerializer(posts, many=True).data}
+
+    @staticmethod
+    def measure(call, seconds):
+        """
+        Call `call` repeatedly for about `seconds`; return the calls per second.
+        """
+        calls = 0
+        start = time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < seconds:
+            call()
+            calls += 1
+        return calls / elapsed
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from RBAC_Project.benchmarking import benchmark_database
+from blog_app.models import Comment, Post
+from blog_app.serializers import CommentSerializer, PostSerializer, comment_values, post_values
+from user_app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare PostSerializer/CommentSerializer on model instances with the ValuesSerializer "
+        "fast path on value rows: per-row cost of fetching and serializing a list."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            rows = options['rows']
+            user = User.objects.create(email='bench@example.com', username='bench')
+            posts = Post.objects.bulk_create([
+                Post(title=f'Post {i}', content='Benchmark post body.', created_by=user) for i in range(rows)
+            ])
+            Comment.objects.bulk_create([
+                Comment(post=posts[i % len(posts)], content=f'Comment {i}', created_by=user) for i in range(rows)
+            ])
+
+            cases = {
+                'posts': (
+                    lambda: PostSerializer(Post.objects.with_author(), many=True).data,
+                    lambda: post_values.to_representation(post_values.values(Post.objects.all())),
+                ),
+                'comments': (
+                    lambda: CommentSerializer(Comment.objects.with_author(), many=True).data,
+                    lambda: comment_values.to_representation(comment_values.values(Comment.objects.all())),
+                ),
+            }
+            self.stdout.write(f"{rows} rows, best of {options['repeat']}")
+            for name, (serializer, values) in cases.items():
+                before = self.best(serializer, options['repeat']) / rows
+                after = self.best(values, options['repeat']) / rows
+                self.stdout.write(
+                    f"{name:<9} serializer {before * 1e6:6.1f} us/row  values {after * 1e6:6.1f} us/row  "
+                    f"{before / after:4.1f}x"
+                )
+
+    @staticmethod
+    def best(call, repeat):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            times.append(time.perf_counter() - start)
+        return min(times)
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_app.export import EXPORTS, OUTPUTS, InvalidExport, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream posts or comments to a file (or stdout) as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--output', choices=OUTPUTS, default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--since')
+        parser.add_argument('--until')
+        parser.add_argument('--author', help="Author email or id.")
+        parser.add_argument('--file', '-f', help="Write here instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            chunks = export_stream(
+                options['kind'],
+                output=options['output'],
+                compress=options['gzip'],
+                since=options['since'],
+                until=options['until'],
+                author=options['author'],
+            )
+        except InvalidExport as e:
+            raise CommandError(str(e))
+
+        if options['file']:
+            with open(options['file'], 'wb') as out:
+                for chunk in chunks:
+                    out.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog_app.counters import COUNTERS, reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized User.post_count and Post.comment_count columns in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('counters', nargs='*', choices=sorted(COUNTERS), help="Default: all of them.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for field in options['counters'] or sorted(COUNTERS):
+            fixed = reconcile(field, batch_size=options['batch_size'])
+            self.stdout.write(f"{field}: {fixed} row(s) fixed")
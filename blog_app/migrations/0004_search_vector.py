@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:42
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# GIN indexes and the backfill only exist on PostgreSQL; other databases
+# search through the in-process index in blog_app.search.
+POSTGRES_FORWARD = [
+    "UPDATE blog_app_post SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+    "UPDATE blog_app_comment SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+    "CREATE INDEX IF NOT EXISTS post_search_vector_idx ON blog_app_post USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS comment_search_vector_idx ON blog_app_comment USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS post_search_vector_idx",
+    "DROP INDEX IF EXISTS comment_search_vector_idx",
+]
+
+
+def run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0003_comment_post_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_on_postgres(POSTGRES_FORWARD), run_on_postgres(POSTGRES_BACKWARD)),
+    ]
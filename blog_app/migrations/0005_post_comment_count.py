@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    User = apps.get_model('user_app', 'User')
+    Post = apps.get_model('blog_app', 'Post')
+    Comment = apps.get_model('blog_app', 'Comment')
+
+    def count(model, foreign_key):
+        return Coalesce(Subquery(
+            model.objects.filter(**{foreign_key: OuterRef('pk')}).order_by()
+            .values(foreign_key).annotate(count=Count('pk')).values('count')
+        ), 0)
+
+    User.objects.update(post_count=count(Post, 'created_by'))
+    Post.objects.update(comment_count=count(Comment, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0004_search_vector'),
+        ('user_app', '0004_user_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
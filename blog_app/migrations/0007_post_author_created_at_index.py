@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0006_comment_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Build the composite index before dropping the foreign key's own,
+        # which it makes redundant.
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_by', 'created_at', 'id'], name='post_author_created_at_idx'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='created_by',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,13 +1,57 @@
 import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Prefetch
+from django.utils import timezone
 from user_app.models import User
 
+class PostQuerySet(models.QuerySet):
+    def with_author(self):
+        """
+        Join the author in the same query and load only the columns the
+        post serializer renders, so listing N posts stays one query.
+        """
+        return self.select_related('created_by').only(
+            'id', 'title', 'content', 'created_at', 'comment_count', 'created_by__email',
+        )
+
+    def with_comments(self, limit):
+        """
+        Prefetch the first `limit` comments (oldest first, with authors)
+        into `first_comments`: two queries in total however many comments
+        a post has.
+        """
+        first_comments = Comment.objects.with_author().order_by('created_at', 'id')[:limit]
+        return self.prefetch_related(
+            Prefetch('comments', queryset=first_comments, to_attr='first_comments')
+        )
+
+class CommentQuerySet(models.QuerySet):
+    def with_author(self):
+        return self.select_related('created_by').only(
+            'id', 'post', 'content', 'created_at', 'created_by__email',
+        )
+
 class Post(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=100)
     content = models.TextField()
-    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
+    # Indexed as the leading column of post_author_created_at_idx.
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by blog_app.counters.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Maintained on PostgreSQL only; see blog_app.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='post_created_at_id_idx'),
+            # Author feeds (blog_app.filters), newest first without a sort.
+            models.Index(fields=['created_by', 'created_at', 'id'], name='post_author_created_at_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -17,7 +61,17 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     content = models.TextField()
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the instance is built rather than when it is saved, so a
+    # comment queued by blog_app.writebehind keeps the time it was posted.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_at_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.created_by.email} on {self.post.title}"
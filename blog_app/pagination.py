@@ -0,0 +1,162 @@
+import base64
+import uuid
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination on (created_at, id), newest first.
+
+    Each page seeks past the last row of the previous one with an indexed
+    range condition instead of an OFFSET, so every page costs the same no
+    matter how deep the client has paged.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    descending = True
+    # URL the `next` link is built on; None uses the request's own.
+    base_url = None
+
+    def __init__(self, page_size=None, max_page_size=None):
+        self.default_page_size = page_size or getattr(settings, 'BLOG_PAGE_SIZE', 20)
+        self.max_page_size = max_page_size or getattr(settings, 'BLOG_MAX_PAGE_SIZE', 100)
+
+    @classmethod
+    def get_ordering(cls):
+        if cls.descending:
+            return ('-created_at', '-id')
+        return ('created_at', 'id')
+
+    @classmethod
+    def seek(cls, created_at, pk):
+        """
+        Condition selecting the rows after (created_at, pk) in page order.
+        """
+        if cls.descending:
+            return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
+
+    @staticmethod
+    def encode_cursor(obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+            created_at = parse_datetime(created_at)
+            pk = uuid.UUID(pk)
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+        if created_at is None:
+            raise InvalidCursor(cursor)
+        return created_at, pk
+
+    def get_page_size(self, request, param=None):
+        value = request.query_params.get(param or self.page_size_query_param)
+        if value is None:
+            return self.default_page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            return self.default_page_size
+        if page_size < 1:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    def page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.get_ordering())
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.seek(*self.decode_cursor(cursor)))
+
+        # Fetch one extra row to find out whether there is a next page.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if self.has_next else None
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([obj async for obj in self.page_queryset(queryset, request)])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.base_url or self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class CommentKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for a post's comments, oldest first.
+    """
+    descending = False
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Page-number pagination for ranked search results, which have no
+    stable (created_at, id) order to seek on. `fetch(limit, offset)`
+    returns the ranked matches.
+    """
+    page_query_param = 'page'
+
+    def get_page_number(self, request):
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            return 1
+        return max(number, 1)
+
+    def paginate_results(self, fetch, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.page_number = self.get_page_number(request)
+
+        # Fetch one extra row to find out whether there is a next page.
+        rows = fetch(self.page_size + 1, (self.page_number - 1) * self.page_size)
+        self.has_next = len(rows) > self.page_size
+        return rows[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
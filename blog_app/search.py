@@ -0,0 +1,199 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, TextField, Value
+
+from .models import Post, Comment
+
+# Searchable fields and their weights ('A' ranks above 'B').
+SEARCH_FIELDS = {
+    Post: (('title', 'A'), ('content', 'B')),
+    Comment: (('content', 'B'),),
+}
+
+KINDS = {
+    'posts': Post,
+    'comments': Comment,
+}
+
+LOCAL_WEIGHTS = {'A': 2.0, 'B': 1.0}
+
+# Text search configuration; the backfill in migration 0004 uses the same.
+SEARCH_CONFIG = 'english'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def search_vector(obj):
+    """
+    Expression that computes `obj`'s search vector from its in-memory field
+    values, to be assigned before save() or bulk_create(). None when not on
+    PostgreSQL.
+    """
+    if not uses_postgres():
+        return None
+    vector = None
+    for field, weight in SEARCH_FIELDS[type(obj)]:
+        part = SearchVector(Value(getattr(obj, field), output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1]
+
+
+class InvertedIndex:
+    """
+    In-process inverted index used instead of PostgreSQL full-text search
+    on other databases (SQLite in tests and development).
+
+    Postings map each term to {doc_id: weighted term frequency}. A query
+    intersects the postings of its terms, starting from the rarest, and
+    ranks the matches with BM25, so its cost depends on the posting list
+    sizes rather than on the size of the corpus.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, model):
+        self.model = model
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.total_length = 0.0
+        self.built = False
+        self._lock = threading.RLock()
+
+    def build(self):
+        with self._lock:
+            if self.built:
+                return
+            fields = [field for field, _ in SEARCH_FIELDS[self.model]]
+            for obj in self.model.objects.only('id', *fields).iterator(chunk_size=2000):
+                self._add(obj)
+            self.built = True
+
+    def _terms(self, obj):
+        weights = defaultdict(float)
+        for field, weight in SEARCH_FIELDS[self.model]:
+            for token in tokenize(getattr(obj, field) or ''):
+                weights[token] += LOCAL_WEIGHTS[weight]
+        return weights
+
+    def _add(self, obj):
+        self._remove(obj.pk)
+        terms = self._terms(obj)
+        for term, frequency in terms.items():
+            self.postings[term][obj.pk] = frequency
+        length = sum(terms.values())
+        self.doc_terms[obj.pk] = list(terms)
+        self.doc_lengths[obj.pk] = length
+        self.total_length += length
+
+    def _remove(self, pk):
+        for term in self.doc_terms.pop(pk, ()):
+            docs = self.postings[term]
+            docs.pop(pk, None)
+            if not docs:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(pk, 0.0)
+
+    def add(self, obj):
+        with self._lock:
+            if self.built:
+                self._add(obj)
+
+    def remove(self, pk):
+        with self._lock:
+            if self.built:
+                self._remove(pk)
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.doc_terms.clear()
+            self.doc_lengths.clear()
+            self.total_length = 0.0
+            self.built = False
+
+    def search(self, query, limit, offset=0):
+        """
+        Return [(pk, score)] for documents containing every query term,
+        best first.
+        """
+        self.build()
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+            if not postings[0]:
+                return []
+            candidates = set(postings[0])
+            for docs in postings[1:]:
+                candidates.intersection_update(docs)
+                if not candidates:
+                    return []
+
+            count = len(self.doc_lengths)
+            average_length = self.total_length / count if count else 1.0
+            scores = []
+            for pk in candidates:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[pk] / average_length)
+                score = 0.0
+                for docs in postings:
+                    frequency = docs[pk]
+                    idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+                    score += idf * frequency * (self.k1 + 1) / (frequency + norm)
+                scores.append((pk, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[offset:offset + limit]
+
+
+local_indexes = {model: InvertedIndex(model) for model in SEARCH_FIELDS}
+
+
+def index_objects(objs):
+    """
+    Bring the local index up to date for objects written without save(),
+    e.g. by bulk_create. On PostgreSQL the vector is written with the row.
+    """
+    if uses_postgres():
+        return
+    for obj in objs:
+        local_indexes[type(obj)].add(obj)
+
+
+def search(kind, query, limit, offset=0):
+    """
+    Return up to `limit` objects of `kind` matching `query`, best match
+    first, each with a `rank` attribute.
+    """
+    model = KINDS[kind]
+    queryset = model.objects.with_author()
+    if uses_postgres():
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return list(
+            queryset.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', '-created_at')[offset:offset + limit]
+        )
+
+    ranked = local_indexes[model].search(query, limit, offset)
+    objs = queryset.in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, score in ranked:
+        # The local index may still list rows deleted by another process.
+        if pk in objs:
+            objs[pk].rank = score
+            results.append(objs[pk])
+    return results
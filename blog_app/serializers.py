@@ -1,12 +1,17 @@
-from rest_framework import serializers
+from django.urls import reverse
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from .models import Post, Comment
+from .pagination import CommentKeysetPagination
 
 class PostSerializer(serializers.ModelSerializer):
     created_by = serializers.StringRelatedField()
 
     class Meta:
         model = Post
-        fields = ['id', 'title', 'content', 'created_by', 'created_at']
+        fields = ['id', 'title', 'content', 'created_by', 'created_at', 'comment_count']
 
 class CommentSerializer(serializers.ModelSerializer):
     created_by = serializers.StringRelatedField()
@@ -14,3 +19,133 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'post', 'content', 'created_by', 'created_at']
+
+
+class PostDetailSerializer(PostSerializer):
+    comments = CommentSerializer(many=True, read_only=True, source='first_comments')
+    comments_next = serializers.SerializerMethodField()
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['comments', 'comments_next']
+
+    def get_comments_next(self, post):
+        """
+        Link to the comments after the embedded ones, if there are any.
+        """
+        if post.comment_count <= len(post.first_comments):
+            return None
+        url = reverse('post_comments', args=[post.pk])
+        url = replace_query_param(url, CommentKeysetPagination.page_size_query_param, len(post.first_comments))
+        url = replace_query_param(url, CommentKeysetPagination.cursor_query_param,
+                                  CommentKeysetPagination.encode_cursor(post.first_comments[-1]))
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class PostSearchSerializer(PostSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['rank']
+
+
+class CommentSearchSerializer(CommentSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['rank']
+
+
+class BulkCommentSerializer(serializers.ModelSerializer):
+    """
+    Validates `post` as a bare UUID; blog_app.bulk checks that the posts
+    exist with one query per batch.
+    """
+    post = serializers.UUIDField()
+
+    class Meta:
+        model = Comment
+        fields = ['post', 'content']
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for listing many rows with a ModelSerializer.
+
+    Rows come from `.values_list(named=True)` instead of model instances,
+    and each field's to_representation is replaced, once per call, by the
+    cheapest function giving the same output (str for UUIDs, nothing for
+    strings, integers and primary keys, a fixed-timezone isoformat for
+    datetimes).
+    The output is identical to `serializer_class(objs, many=True).data`.
+
+    `sources` maps fields whose value is not the column of the same name
+    to a values() lookup, e.g. a StringRelatedField to the column its
+    __str__ returns.
+    """
+
+    def __init__(self, serializer_class, sources=None):
+        self.serializer_class = serializer_class
+        self.sources = sources or {}
+
+    @cached_property
+    def fields(self):
+        return self.serializer_class().fields
+
+    @cached_property
+    def columns(self):
+        return tuple(self.sources.get(name, field.source) for name, field in self.fields.items())
+
+    def values(self, queryset):
+        """
+        The named rows this serializer reads. They keep `id` and
+        `created_at` attributes for the keyset paginators.
+        """
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, rows):
+        names = tuple(self.fields)
+        converters = tuple(self.compile(field) for field in self.fields.values())
+        return [
+            dict(zip(names, [
+                value if convert is None or value is None else convert(value)
+                for convert, value in zip(converters, row)
+            ]))
+            for row in rows
+        ]
+
+    @staticmethod
+    def compile(field):
+        """
+        A function equivalent to field.to_representation on a column value,
+        or None when the column value is already the output.
+        """
+        if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+            return str
+        if isinstance(field, (serializers.CharField, serializers.StringRelatedField, serializers.IntegerField)):
+            return None
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return None
+        if isinstance(field, serializers.DateTimeField):
+            return ValuesSerializer.compile_datetime(field)
+        return field.to_representation
+
+    @staticmethod
+    def compile_datetime(field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if field_timezone is None or output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+
+
+post_values = ValuesSerializer(PostSerializer, sources={'created_by': 'created_by__email'})
+comment_values = ValuesSerializer(CommentSerializer, sources={'created_by': 'created_by__email'})
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from user_app.models import User
+from .cache import post_list_cache
+from .models import Post, Comment
+from .search import index_objects, local_indexes, search_vector
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_list(sender, **kwargs):
+    # Bump right away so this request never reads its own stale list, and
+    # again after commit so a concurrent reader can't re-cache pre-commit rows.
+    post_list_cache.invalidate()
+    transaction.on_commit(post_list_cache.invalidate)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_email(sender, created, update_fields, **kwargs):
+    # Posts and comments are listed with their author's email.
+    if not created and (update_fields is None or 'email' in update_fields):
+        invalidate_post_list(sender)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def set_search_vector(sender, instance, **kwargs):
+    instance.search_vector = search_vector(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_saved(sender, instance, **kwargs):
+    index_objects([instance])
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def unindex_deleted(sender, instance, **kwargs):
+    local_indexes[sender].remove(instance.pk)
@@ -1,3 +1,756 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import tempfile
+import uuid
+from urllib.parse import parse_qs, urlsplit
+from datetime import datetime, timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, AsyncRequestFactory, TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user_app.models import User
+from user_app.tokens import RBACRefreshToken
+from .bulk import CommentIngest
+from .cache import LocalLRUCache, ReadThroughCache, post_list_cache
+from .counters import create_comment, delete_post, reconcile
+from .filters import post_filter
+from .models import Post, Comment
+from .pagination import KeysetPagination
+from .search import local_indexes
+from .serializers import CommentSerializer, PostSerializer, comment_values, post_values
+from .views import AsyncCommentView, AsyncPostView
+from .writebehind import CommentWriter
+
+
+class BlogTestCase(TestCase):
+    def setUp(self):
+        # The post list cache and search index outlive the per-test
+        # transaction rollback.
+        post_list_cache.clear()
+        for index in local_indexes.values():
+            index.clear()
+
+
+class PostPaginationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(5):
+            Post.objects.create(title=f'Post {i}', content='body', created_by=self.user)
+
+    def test_unpaginated_list_is_unchanged(self):
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+
+    def test_cursor_walks_every_post_once(self):
+        seen = []
+        url = reverse('posts') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(post['id'] for post in response.data['results'])
+            url = response.data['next']
+        expected = [str(pk) for pk in Post.objects.order_by('-created_at', '-id').values_list('id', flat=True)]
+        self.assertEqual(seen, expected)
+
+    def test_page_size_is_capped(self):
+        with self.settings(BLOG_MAX_PAGE_SIZE=3):
+            response = self.client.get(reverse('posts') + '?page_size=1000')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('posts') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryCountTests(BlogTestCase):
+    """
+    Listing endpoints must run a constant number of queries regardless of
+    how many rows they return.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.viewer = User.objects.create_user(email='viewer@example.com', username='viewer', password='pass12345')
+        self.client.force_authenticate(self.viewer)
+
+    def create_rows(self, count):
+        start = Post.objects.count()
+        for i in range(start, start + count):
+            author = User.objects.create(email=f'author{i}@example.com', username=f'author{i}')
+            post = Post.objects.create(title=f'Post {i}', content='body', created_by=author)
+            Comment.objects.create(post=post, content='comment', created_by=author)
+
+    def assert_constant_queries(self, fetch, queries=1):
+        self.create_rows(1)
+        with self.assertNumQueries(queries):
+            fetch()
+        self.create_rows(10)
+        with self.assertNumQueries(queries):
+            fetch()
+
+    def test_post_list(self):
+        self.assert_constant_queries(lambda: self.client.get(reverse('posts')))
+
+    def test_post_list_paginated(self):
+        self.assert_constant_queries(lambda: self.client.get(reverse('posts') + '?page_size=50'))
+
+    def test_comment_serialization(self):
+        self.assert_constant_queries(
+            lambda: CommentSerializer(Comment.objects.with_author(), many=True).data
+        )
+
+    def test_post_list_renders_author_email(self):
+        self.create_rows(1)
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(response.data[0]['created_by'], 'author0@example.com')
+
+
+class ValuesSerializerTests(BlogTestCase):
+    def test_same_output_as_model_serializers(self):
+        user = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        post = Post.objects.create(title='Caf\u00e9', content='', created_by=user)
+        Post.objects.create(title='Second', content='Body', created_by=user)
+        Comment.objects.create(post=post, content='A comment', created_by=user)
+
+        posts = Post.objects.order_by('-created_at', '-id')
+        self.assertEqual(post_values.to_representation(post_values.values(posts)), PostSerializer(posts, many=True).data)
+        comments = Comment.objects.order_by('created_at')
+        self.assertEqual(
+            comment_values.to_representation(comment_values.values(comments)),
+            CommentSerializer(comments, many=True).data,
+        )
+
+
+class PostListCacheTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='author@example.com', username='author', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(title='First', content='body', created_by=self.user)
+
+    def test_repeated_reads_hit_the_cache(self):
+        self.client.get(reverse('posts'))
+        misses = post_list_cache.stats()['misses']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('posts'))
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(post_list_cache.stats()['misses'], misses)
+
+    def test_create_invalidates(self):
+        self.client.get(reverse('posts'))
+        self.client.post(reverse('posts'), {'title': 'Second', 'content': 'body'})
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(len(response.data), 2)
+
+    def test_delete_invalidates(self):
+        self.client.get(reverse('posts'))
+        self.client.delete(reverse('post_detail', args=[self.post.pk]))
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(response.data, [])
+
+    def test_comment_invalidates(self):
+        self.client.get(reverse('posts'))
+        version = post_list_cache.get_version()
+        self.client.post(reverse('comments'), {'post': self.post.pk, 'content': 'hi'})
+        self.assertGreater(post_list_cache.get_version(), version)
+
+    def test_unread_parameters_share_an_entry(self):
+        Post.objects.create(title='Second', content='body', created_by=self.user)
+        self.client.get(reverse('posts'), {'page_size': 1, 'x': 1})
+        misses = post_list_cache.stats()['misses']
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts'), {'x': 2, 'page_size': 1})
+            response = self.client.get(reverse('posts'), {'page_size': 1, 'utm': 'junk'})
+        self.assertEqual(post_list_cache.stats()['misses'], misses)
+        # Built from the cache key, not from the first request's URL.
+        self.assertEqual(sorted(parse_qs(urlsplit(response.data['next']).query)), ['cursor', 'page_size'])
+
+    def test_long_full_list_is_not_cached(self):
+        Post.objects.create(title='Second', content='body', created_by=self.user)
+        posts = ReadThroughCache('test')
+        with self.settings(BLOG_POST_CACHE={'MAX_LIST_ROWS': 1}), mock.patch('blog_app.views.post_list_cache', posts):
+            self.assertEqual(len(self.client.get(reverse('posts')).data), 2)
+            self.client.get(reverse('posts'), {'page_size': 1})
+        # Only the page was kept.
+        self.assertEqual(posts.stats()['local_size'], 1)
+
+    def test_shared_tier_is_off_without_a_shared_cache(self):
+        with self.settings(BLOG_POST_CACHE={}):
+            self.assertIsNone(ReadThroughCache.from_settings('test', 'BLOG_POST_CACHE').shared)
+
+    def test_invalidate_reaches_other_processes_through_the_shared_tier(self):
+        # Two instances on one cache alias stand in for two processes.
+        cache.clear()
+        first = ReadThroughCache('test', shared_alias='default')
+        second = ReadThroughCache('test', shared_alias='default')
+        self.assertEqual(second.get_or_load('page', lambda: 'old'), 'old')
+        first.invalidate()
+        self.assertEqual(second.get_or_load('page', lambda: 'new'), 'new')
+
+    def test_local_lru_evicts_oldest(self):
+        lru = LocalLRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+
+    def test_local_lru_expires(self):
+        lru = LocalLRUCache(maxsize=2, ttl=-1)
+        lru.set('a', 1)
+        self.assertIsNone(lru.get('a'))
+
+
+class BulkIngestTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create(email='admin@example.com', username='admin', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post_ndjson(self, url, rows, **params):
+        body = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        return self.client.generic('POST', url, body, content_type='application/x-ndjson', QUERY_STRING=params.get('query', ''))
+
+    def test_posts_from_ndjson(self):
+        rows = [{'title': f'Post {i}', 'content': 'body'} for i in range(5)] + [{'content': 'no title'}, '{broken']
+        response = self.post_ndjson(reverse('posts_bulk'), rows, query='batch_size=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual([error['row'] for error in response.data['errors']], [5, 6])
+        self.assertEqual(Post.objects.filter(created_by=self.admin).count(), 5)
+
+    def test_bulk_insert_invalidates_post_list(self):
+        self.assertEqual(self.client.get(reverse('posts')).data, [])
+        self.client.post(reverse('posts_bulk'), [{'title': 'Post', 'content': 'body'}], format='json')
+        self.assertEqual(len(self.client.get(reverse('posts')).data), 1)
+
+    def test_comments_check_posts_once_per_batch(self):
+        post = Post.objects.create(title='Post', content='body', created_by=self.admin)
+        rows = [{'post': str(post.pk), 'content': f'c{i}'} for i in range(10)]
+        rows.append({'post': str(uuid.uuid4()), 'content': 'orphan'})
+        ingest = CommentIngest(self.admin, batch_size=100)
+        # Post lookup, then SAVEPOINT / bulk INSERT / counter UPDATE / RELEASE.
+        with self.assertNumQueries(5):
+            ingest.run(rows)
+        self.assertEqual(ingest.created, 10)
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 10)
+        self.assertEqual(ingest.errors[0]['row'], 10)
+        self.assertIn('post', ingest.errors[0]['errors'])
+
+    def test_errors_are_capped(self):
+        ingest = CommentIngest(self.admin, batch_size=10, max_errors=3).run([{'content': 'x'}] * 20)
+        summary = ingest.summary()
+        self.assertEqual(summary['failed'], 20)
+        self.assertEqual(len(summary['errors']), 3)
+        self.assertTrue(summary['errors_truncated'])
+
+    def test_requires_bulk_permission(self):
+        self.client.force_authenticate(User.objects.create(email='u@example.com', username='u'))
+        response = self.client.post(reverse('comments_bulk'), [], format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ExportTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create(email='admin@example.com', username='admin', role='admin')
+        self.other = User.objects.create(email='other@example.com', username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.post = Post.objects.create(title='Admin post', content='body', created_by=self.admin)
+        Post.objects.create(title='Other post', content='body, "quoted"', created_by=self.other)
+        Comment.objects.create(post=self.post, content='hi', created_by=self.other)
+
+    def read(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_matches_serializer_output(self):
+        response = self.client.get(reverse('export', args=['posts']))
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in self.read(response).decode().splitlines()]
+        self.assertEqual(len(rows), 2)
+        listed = {post['id']: post for post in self.client.get(reverse('posts')).data}
+        for row in rows:
+            self.assertEqual(row, dict(listed[row['id']]))
+
+    def test_csv_filtered_by_author(self):
+        response = self.client.get(reverse('export', args=['posts']), {'output': 'csv', 'author': 'other@example.com'})
+        rows = list(csv.reader(io.StringIO(self.read(response).decode())))
+        self.assertEqual(rows[0], ['id', 'title', 'content', 'created_by', 'created_at', 'comment_count'])
+        self.assertEqual([row[2] for row in rows[1:]], ['body, "quoted"'])
+
+    def test_gzip_comments(self):
+        response = self.client.get(reverse('export', args=['comments']), {'gzip': '1', 'since': '2000-01-01'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = gzip.decompress(self.read(response)).decode().splitlines()
+        self.assertEqual(json.loads(rows[0])['post'], str(self.post.pk))
+
+    def test_until_excludes_later_rows(self):
+        response = self.client.get(reverse('export', args=['posts']), {'until': '2000-01-01'})
+        self.assertEqual(self.read(response), b'')
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(reverse('export', args=['users'])).status_code, 400)
+        response = self.client.get(reverse('export', args=['posts']), {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['message'], 'Invalid date: yesterday')
+
+    def test_requires_export_permission(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(reverse('export', args=['posts'])).status_code, 403)
+
+    async def test_asgi_export_streams(self):
+        pulled = []
+
+        def chunks(*args, **kwargs):
+            for i in range(3):
+                pulled.append(i)
+                yield f'chunk {i}\n'.encode()
+
+        token = RBACRefreshToken.for_user(self.admin).access_token
+        with mock.patch('blog_app.views.export_stream', chunks):
+            response = await AsyncClient().get(
+                reverse('export', args=['posts']), headers={'Authorization': f'Bearer {token}'},
+            )
+            self.assertTrue(response.is_async)
+            content = aiter(response.streaming_content)
+            self.assertEqual(await anext(content), b'chunk 0\n')
+            # Read one chunk at a time, not buffered up front.
+            self.assertEqual(pulled, [0])
+            self.assertEqual([chunk async for chunk in content], [b'chunk 1\n', b'chunk 2\n'])
+
+    async def test_asgi_export_rows(self):
+        token = RBACRefreshToken.for_user(self.admin).access_token
+        response = await AsyncClient().get(
+            reverse('export', args=['posts']), {'output': 'csv'}, headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 3)
+
+    def test_management_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'comments.csv')
+            call_command('export_blog', 'comments', output='csv', file=path)
+            with open(path) as exported:
+                self.assertEqual(len(exported.read().splitlines()), 2)
+
+
+class PostDetailTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='author@example.com', username='author')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(title='Post', content='body', created_by=self.user)
+
+    def add_comments(self, count):
+        for i in range(count):
+            author = User.objects.create(email=f'c{i}-{uuid.uuid4()}@example.com', username=str(uuid.uuid4()))
+            create_comment(author, post=self.post, content=f'comment {i}')
+
+    def test_detail_runs_fixed_queries(self):
+        self.add_comments(2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('post_detail', args=[self.post.pk]))
+        self.add_comments(30)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('post_detail', args=[self.post.pk]))
+        self.assertEqual(response.data['comment_count'], 32)
+        self.assertEqual(len(response.data['comments']), 20)
+        self.assertEqual(response.data['comments'][0]['content'], 'comment 0')
+
+    def test_comment_pages_follow_embedded_comments(self):
+        self.add_comments(7)
+        response = self.client.get(reverse('post_detail', args=[self.post.pk]), {'comments': 3})
+        contents = [comment['content'] for comment in response.data['comments']]
+        url = response.data['comments_next']
+        while url:
+            page = self.client.get(url).data
+            contents.extend(comment['content'] for comment in page['results'])
+            url = page['next']
+        self.assertEqual(contents, [f'comment {i}' for i in range(7)])
+
+    def test_no_next_link_when_all_comments_are_embedded(self):
+        self.add_comments(2)
+        response = self.client.get(reverse('post_detail', args=[self.post.pk]))
+        self.assertIsNone(response.data['comments_next'])
+
+    def test_missing_post(self):
+        response = self.client.get(reverse('post_detail', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='reader@example.com', username='reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.in_title = Post.objects.create(title='Django caching', content='Notes on caches.', created_by=self.user)
+        self.in_content = Post.objects.create(title='Notes', content='Caching in Django views.', created_by=self.user)
+        Post.objects.create(title='Unrelated', content='Nothing to see.', created_by=self.user)
+
+    def search(self, **params):
+        return self.client.get(reverse('search'), params)
+
+    def test_ranks_title_matches_first(self):
+        response = self.search(q='django caching')
+        self.assertEqual(response.status_code, 200)
+        ids = [post['id'] for post in response.data['results']]
+        self.assertEqual(ids, [str(self.in_title.pk), str(self.in_content.pk)])
+        self.assertGreater(response.data['results'][0]['rank'], response.data['results'][1]['rank'])
+
+    def test_index_follows_writes(self):
+        self.search(q='django')
+        new = Post.objects.create(title='More django', content='', created_by=self.user)
+        self.in_title.delete()
+        ids = {post['id'] for post in self.search(q='django').data['results']}
+        self.assertEqual(ids, {str(self.in_content.pk), str(new.pk)})
+
+    def test_pagination(self):
+        first = self.search(q='django', page_size=1)
+        self.assertEqual(len(first.data['results']), 1)
+        self.assertIn('page=2', first.data['next'])
+        second = self.client.get(first.data['next'])
+        self.assertIsNone(second.data['next'])
+        self.assertNotEqual(first.data['results'][0]['id'], second.data['results'][0]['id'])
+
+    def test_comments_and_bulk_ingest(self):
+        ingest = CommentIngest(self.user)
+        self.search(q='anything', type='comments')
+        ingest.run([{'post': str(self.in_title.pk), 'content': 'Great django writeup'}])
+        results = self.search(q='writeup', type='comments').data['results']
+        self.assertEqual([comment['content'] for comment in results], ['Great django writeup'])
+
+    def test_requires_query(self):
+        self.assertEqual(self.search(q=' ').status_code, 400)
+        self.assertEqual(self.search(q='django', type='users').status_code, 400)
+
+
+class CounterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='author@example.com', username='author', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_writes_keep_counters(self):
+        post_id = self.client.post(reverse('posts'), {'title': 'Post', 'content': 'body'}).data['id']
+        self.client.post(reverse('comments'), {'post': post_id, 'content': 'hi'})
+        self.client.post(reverse('comments_bulk'), [{'post': post_id, 'content': 'bulk'}] * 3, format='json')
+        listed = self.client.get(reverse('posts')).data
+        self.assertEqual(listed[0]['comment_count'], 4)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.post_count, 1)
+
+        self.client.delete(reverse('post_detail', args=[post_id]))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.post_count, 0)
+
+    def test_new_comment_changes_list_etag(self):
+        post = Post.objects.create(title='Post', content='body', created_by=self.user)
+        etag = self.client.get(reverse('posts'))['ETag']
+        self.client.post(reverse('comments'), {'post': str(post.pk), 'content': 'hi'})
+        response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['comment_count'], 1)
+
+    def test_reconcile_fixes_drift(self):
+        posts = Post.objects.bulk_create([Post(title=f'P{i}', content='body', created_by=self.user) for i in range(5)])
+        Comment.objects.bulk_create([Comment(post=posts[0], content='c', created_by=self.user) for _ in range(2)])
+        self.assertEqual(reconcile('post_count', batch_size=2), 1)
+        self.assertEqual(reconcile('comment_count', batch_size=2), 1)
+        self.assertEqual(reconcile('comment_count', batch_size=2), 0)
+        self.user.refresh_from_db()
+        posts[0].refresh_from_db()
+        self.assertEqual((self.user.post_count, posts[0].comment_count), (5, 2))
+
+    def test_delete_with_drifted_counter(self):
+        post = Post.objects.create(title='Post', content='body', created_by=self.user)
+        response = self.client.delete(reverse('post_detail', args=[post.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.post_count, 0)
+
+    def test_delete_counts_only_removed_rows(self):
+        Post.objects.create(title='Other', content='body', created_by=self.user)
+        post = Post.objects.create(title='Post', content='body', created_by=self.user)
+        reconcile('post_count')
+        stale = Post.objects.get(pk=post.pk)
+        delete_post(post)
+        # A concurrent request still holding the post deletes nothing.
+        delete_post(stale)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.post_count, 1)
+
+    def test_management_command(self):
+        Post.objects.create(title='Post', content='body', created_by=self.user)
+        out = io.StringIO()
+        call_command('reconcile_counters', 'post_count', stdout=out)
+        self.assertEqual(out.getvalue(), 'post_count: 1 row(s) fixed\n')
+
+
+class WriteBehindTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='author@example.com', username='author', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(title='Post', content='body', created_by=self.user)
+
+    def use_writer(self, **options):
+        writer = CommentWriter(background=False, **options)
+        patcher = mock.patch('blog_app.views.comment_writer', writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return writer
+
+    def comment(self, content='hi', post=None):
+        return self.client.post(reverse('comments'), {'post': str(post or self.post.pk), 'content': content})
+
+    def test_ack_mode_queues_then_writes_one_batch(self):
+        writer = self.use_writer(mode='ack')
+        responses = [self.comment(f'c{i}') for i in range(3)]
+        self.assertEqual([response.status_code for response in responses], [202] * 3)
+        self.assertFalse(Comment.objects.exists())
+
+        # Post check, then SAVEPOINT / bulk INSERT / counter UPDATE / RELEASE
+        # for all three.
+        with self.assertNumQueries(5):
+            self.assertEqual(writer.flush(), 3)
+        self.assertEqual((writer.queued, writer.written, writer.batches), (3, 3, 1))
+        stored = {str(comment.pk): comment for comment in Comment.objects.all()}
+        for response in responses:
+            comment = stored[response.data['id']]
+            self.assertEqual(CommentSerializer(comment).data['created_at'], response.data['created_at'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
+
+    def test_rows_of_deleted_posts_fail_alone(self):
+        writer = self.use_writer(mode='ack')
+        doomed = Post.objects.create(title='Doomed', content='body', created_by=self.user)
+        self.comment('kept')
+        self.comment('lost', post=doomed.pk)
+        Post.objects.filter(pk=doomed.pk).delete()
+        with self.assertLogs('blog_app.writebehind', 'ERROR') as logs:
+            writer.flush()
+        self.assertIn('Dropped queued comment', logs.output[0])
+        self.assertEqual((writer.written, writer.failed), (1, 1))
+        self.assertEqual(list(Comment.objects.values_list('content', flat=True)), ['kept'])
+
+    def test_full_queue_is_rejected(self):
+        self.use_writer(mode='ack', max_queue=1, wait_timeout=0.01)
+        self.assertEqual(self.comment().status_code, 202)
+        self.assertEqual(self.comment().status_code, 503)
+
+    def test_sync_mode_stops_waiting(self):
+        # Nothing writes in the background, so the wait times out.
+        writer = self.use_writer(mode='sync', wait_timeout=0.01)
+        response = self.comment()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(writer.flush(), 1)
+        self.assertTrue(Comment.objects.filter(pk=response.data['id']).exists())
+
+    async def test_async_sync_mode_stops_waiting(self):
+        writer = CommentWriter(mode='sync', background=False, wait_timeout=0.01)
+        comment, stored = await writer.acreate(self.user, post=self.post, content='hi')
+        self.assertFalse(stored)
+        # The timeout did not cancel the queued write.
+        self.assertEqual(await sync_to_async(writer.flush)(), 1)
+        self.assertTrue(await Comment.objects.filter(pk=comment.pk).aexists())
+
+    def test_post_commit_failure_keeps_comments(self):
+        writer = CommentWriter(mode='sync', background=False)
+        future = writer.submit(writer.build(self.user, post=self.post, content='hi'))
+        with mock.patch('blog_app.writebehind.index_objects', side_effect=RuntimeError('search is down')), \
+                self.assertLogs('blog_app.writebehind', 'ERROR'):
+            writer.flush()
+        self.assertEqual(future.result(timeout=0).content, 'hi')
+        self.assertEqual((writer.written, writer.failed), (1, 0))
+        self.assertTrue(Comment.objects.filter(pk=future.result().pk).exists())
+
+
+class BackgroundWriteBehindTests(TransactionTestCase):
+    def test_sync_mode_answers_after_commit(self):
+        user = User.objects.create(email='author@example.com', username='author', role='admin')
+        post = Post.objects.create(title='Post', content='body', created_by=user)
+        writer = CommentWriter(mode='sync', max_delay=0.001)
+        with mock.patch('blog_app.views.comment_writer', writer):
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.post(reverse('comments'), {'post': str(post.pk), 'content': 'hi'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Comment.objects.filter(pk=response.data['id']).exists())
+        self.assertEqual(writer.batches, 1)
+
+
+class PostFilterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.creator = User.objects.create(email='creator@example.com', username='creator', role='creator')
+        self.reader = User.objects.create(email='reader@example.com', username='reader', role='user')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+        for title, author, day in [('old', self.creator, 1), ('new', self.creator, 20), ('other', self.reader, 10)]:
+            post = Post.objects.create(title=title, content='body', created_by=author)
+            Post.objects.filter(pk=post.pk).update(created_at=datetime(2024, 1, day, tzinfo=timezone.utc))
+
+    def titles(self, **params):
+        response = self.client.get(reverse('posts'), {'page_size': 10, **params})
+        self.assertEqual(response.status_code, 200)
+        return [post['title'] for post in response.data['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.titles(created_by=str(self.creator.pk)), ['new', 'old'])
+        self.assertEqual(self.titles(created_by='reader@example.com'), ['other'])
+        self.assertEqual(self.titles(since='2024-01-05', until='2024-01-10'), ['other'])
+        self.assertEqual(self.titles(until='2024-01-10T00:00:00Z'), ['other', 'old'])
+        self.assertEqual(self.titles(role='creator', since='2024-01-05'), ['new'])
+        self.assertEqual(self.titles(role='creator', page_size=1), ['new'])
+
+    def test_invalid_filters(self):
+        for params, message in (({'since': 'yesterday'}, 'Invalid date: yesterday'), ({'role': 'owner'}, 'Invalid role: owner')):
+            response = self.client.get(reverse('posts'), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['message'], message)
+
+    @skipUnless(connection.vendor == 'sqlite', "Parses SQLite's EXPLAIN QUERY PLAN output.")
+    def test_every_filter_combination_uses_an_index(self):
+        values = {
+            'created_by': [str(self.creator.pk), self.creator.email],
+            'since': ['2024-01-01'],
+            'until': ['2024-02-01'],
+            'role': ['creator'],
+        }
+        # "SCAN table" with no "USING ... INDEX" reads the whole table.
+        full_scan = re.compile(r'\bSCAN (\w+)(?! USING)\s*$', re.MULTILINE)
+        cursor = KeysetPagination.seek(datetime(2024, 1, 15, tzinfo=timezone.utc), uuid.uuid4())
+        for count in range(1, len(values) + 1):
+            for names in itertools.combinations(values, count):
+                for choice in itertools.product(*(values[name] for name in names)):
+                    params = dict(zip(names, choice))
+                    posts = post_values.values(Post.objects.filter(post_filter(params))).order_by(*KeysetPagination.get_ordering())
+                    for queryset in (posts, posts[:21], posts.filter(cursor)[:21]):
+                        plan = queryset.explain()
+                        self.assertIsNone(full_scan.search(plan), f"{params}:\n{plan}")
+
+
+class ConditionalRequestTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='author@example.com', username='author', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(title='First', content='body', created_by=self.user)
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get(reverse('posts'))
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('Last-Modified', response)
+        # Answered from the cached page and its digest.
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        # Reloaded, the same rows give the same ETag.
+        post_list_cache.clear()
+        response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_alone_is_not_enough(self):
+        response = self.client.get(reverse('posts'), HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_edits_change_the_etag(self):
+        etag = self.client.get(reverse('posts'))['ETag']
+        self.post.title = 'Edited'
+        self.post.save()
+        response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['title'], 'Edited')
+
+        etag = response['ETag']
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+        response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['created_by'], 'renamed@example.com')
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(reverse('posts'))['ETag']
+        self.client.post(reverse('posts'), {'title': 'Second', 'content': 'body'})
+        response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+        etag = response['ETag']
+        self.client.delete(reverse('post_detail', args=[self.post.pk]))
+        response = self.client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+
+class AsyncViewTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email='async@example.com', username='async')
+        token = RBACRefreshToken.for_user(self.user).access_token
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    async def call(self, view, method, path, data=None, headers=None):
+        factory = AsyncRequestFactory()
+        request = getattr(factory, method)(path, data, content_type='application/json', headers={**self.headers, **(headers or {})})
+        response = await view.as_view()(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    async def test_create_and_list_posts(self):
+        response = await self.call(AsyncPostView, 'post', '/blog/posts/', {'title': 'Async', 'content': 'body'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_by'], 'async@example.com')
+        listed = await self.call(AsyncPostView, 'get', '/blog/posts/')
+        self.assertEqual([post['id'] for post in listed.data], [response.data['id']])
+        page = await self.call(AsyncPostView, 'get', '/blog/posts/?page_size=1')
+        self.assertEqual(page.data['results'], listed.data)
+        response = await self.call(AsyncPostView, 'get', '/blog/posts/', headers={'If-None-Match': listed['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_comment_on_missing_post(self):
+        post = await Post.objects.acreate(title='T', content='C', created_by=self.user)
+        response = await self.call(AsyncCommentView, 'post', '/blog/comments/', {'post': str(uuid.uuid4()), 'content': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('post', response.data)
+        response = await self.call(AsyncCommentView, 'post', '/blog/comments/', {'post': str(post.pk), 'content': 'hi'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, CommentSerializer(await Comment.objects.select_related('created_by').aget()).data)
+
+    async def test_requires_authentication(self):
+        request = AsyncRequestFactory().get('/blog/posts/')
+        response = await AsyncPostView.as_view()(request)
+        self.assertEqual(response.status_code, 401)
@@ -1,8 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from .views import PostView, CommentView
+from .views import (
+    PostView, AsyncPostView, PostDetailView, PostCommentsView, CommentView, AsyncCommentView,
+    PostBulkView, CommentBulkView, ExportView, SearchView,
+)
+
+if settings.ASYNC_VIEWS:
+    PostView, CommentView = AsyncPostView, AsyncCommentView
 
 urlpatterns = [
     path('posts/', PostView.as_view(), name='posts'),
-    path('posts/<uuid:pk>/', PostView.as_view(), name='post_detail'),
+    path('posts/bulk/', PostBulkView.as_view(), name='posts_bulk'),
+    path('posts/<uuid:pk>/', PostDetailView.as_view(), name='post_detail'),
+    path('posts/<uuid:pk>/comments/', PostCommentsView.as_view(), name='post_comments'),
     path('comments/', CommentView.as_view(), name='comments'),
+    path('comments/bulk/', CommentBulkView.as_view(), name='comments_bulk'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('export/<str:kind>/', ExportView.as_view(), name='export'),
 ]
@@ -1,20 +1,61 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.http import urlencode
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from user_app.authentication import model_user
+from user_app.models import User
+from user_app.permissions import RolePermission, engine
 from .models import Post, Comment
-from .serializers import PostSerializer, CommentSerializer
+from .serializers import (
+    PostSerializer, PostDetailSerializer, CommentSerializer, PostSearchSerializer, CommentSearchSerializer,
+    BulkCommentSerializer, post_values, comment_values,
+)
+from .pagination import KeysetPagination, CommentKeysetPagination, SearchPagination, InvalidCursor
+from .cache import post_list_cache
+from .counters import create_post, delete_post
+from .conditional import ListValidators, cached_page
+from .bulk import PostIngest, CommentIngest
+from .export import InvalidExport, export_stream
+from .filters import FILTER_PARAMS, InvalidFilter, post_filter
+from .writebehind import WriterBusy, comment_writer
+from . import search
+from RBAC_Project.async_views import AsyncAPIView, inherit_schema, iterate_in_thread
+from RBAC_Project.fastjson import FastJSONParser
+from RBAC_Project.ndjson import NDJSONParser
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # View to handle Post-related operations
 class PostView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {
+        'GET': 'post.view',
+        'POST': 'post.create',
+    }
 
     @swagger_auto_schema(
         operation_id="Retrieve Posts",
-        operation_description="Retrieve a list of all posts.",
+        operation_description=(
+            "Retrieve a list of all posts, optionally filtered by author, author role "
+            "and creation time. Pass `page_size` and/or `cursor` to get "
+            "a keyset-paginated page (newest first) with a `next` link instead. "
+            "Responses carry an `ETag`; send it back in `If-None-Match` to get "
+            "`304 Not Modified` while the list is unchanged."
+        ),
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor from a previous page's `next` link.", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of posts per page (capped by the server).", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('created_by', openapi.IN_QUERY, description="Author id or email.", type=openapi.TYPE_STRING),
+            openapi.Parameter('since', openapi.IN_QUERY, description="Posts created at or after this ISO datetime (or date).", type=openapi.TYPE_STRING),
+            openapi.Parameter('until', openapi.IN_QUERY, description="Posts created at or before this ISO datetime (or the end of this date).", type=openapi.TYPE_STRING),
+            openapi.Parameter('role', openapi.IN_QUERY, description="Author role.", type=openapi.TYPE_STRING, enum=['admin', 'creator', 'user']),
+        ],
         responses={
             200: openapi.Response(
                 description="List of posts retrieved successfully.",
@@ -30,6 +71,17 @@ class PostView(APIView):
                     ]
                 }
             ),
+            304: openapi.Response(
+                description="The list is unchanged since the given ETag."
+            ),
+            400: openapi.Response(
+                description="Invalid cursor or filter.",
+                examples={
+                    "application/json": {
+                        "message": "Invalid cursor."
+                    }
+                }
+            ),
             500: openapi.Response(
                 description="Error retrieving posts.",
                 examples={
@@ -42,15 +94,60 @@ class PostView(APIView):
     )
     def get(self, request):
         """
-        Retrieve all posts.
+        Retrieve all posts, or a single keyset-paginated page of them.
         """
         try:
-            posts = Post.objects.all()
-            serializer = PostSerializer(posts, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            filters = post_filter(request.query_params)
+            url = self.list_url(request)
+            data, digest = post_list_cache.get_or_load(
+                url, lambda: cached_page(self.list_posts(request, filters, url)), self.cacheable
+            )
+            validators = ListValidators(request, digest)
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+            return validators.apply(Response(data, status=status.HTTP_200_OK))
+        except InvalidCursor:
+            return Response({"message": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        except InvalidFilter as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"message": f"Error retrieving posts: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def list_url(self, request):
+        """
+        The URL of the list `request` asks for with only the parameters this
+        view reads, in a fixed order. It keys post_list_cache, so unknown or
+        reordered parameters can't add entries, and bases the `next` link.
+        """
+        params = request.query_params
+        query = [(name, params[name]) for name in FILTER_PARAMS if params.get(name)]
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination()
+            query.append((paginator.page_size_query_param, paginator.get_page_size(request)))
+            if params.get(paginator.cursor_query_param):
+                query.append((paginator.cursor_query_param, params[paginator.cursor_query_param]))
+        url = request.build_absolute_uri(request.path)
+        return f'{url}?{urlencode(query)}' if query else url
+
+    def cacheable(self, page):
+        # Pages are capped by the page size; the whole list is only kept up
+        # to MAX_LIST_ROWS posts.
+        data, _ = page
+        max_rows = getattr(settings, 'BLOG_POST_CACHE', {}).get('MAX_LIST_ROWS', 1000)
+        return not isinstance(data, list) or len(data) <= max_rows
+
+    def list_posts(self, request, filters, url):
+        # Rendered from value rows by post_values, with the same output as
+        # PostSerializer.
+        posts = post_values.values(Post.objects.filter(filters))
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination()
+            paginator.base_url = url
+            page = paginator.paginate_queryset(posts, request, view=self)
+            return paginator.get_paginated_data(post_values.to_representation(page))
+        return post_values.to_representation(posts)
+
     @swagger_auto_schema(
         operation_id="Create Post",
         operation_description="Create a new post.",
@@ -94,12 +191,138 @@ class PostView(APIView):
         try:
             serializer = PostSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save(created_by=request.user)
+                serializer.instance = create_post(model_user(request.user), serializer.validated_data)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"message": f"Error creating post: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Async variant of PostView, served when settings.ASYNC_VIEWS is on
+class AsyncPostView(AsyncAPIView, PostView):
+
+    @inherit_schema(PostView.get)
+    async def get(self, request):
+        """
+        Retrieve all posts, or a single keyset-paginated page of them.
+        """
+        try:
+            filters = post_filter(request.query_params)
+            url = self.list_url(request)
+
+            async def load():
+                return cached_page(await self.alist_posts(request, filters, url))
+
+            data, digest = await post_list_cache.aget_or_load(url, load, self.cacheable)
+            validators = ListValidators(request, digest)
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+            return validators.apply(Response(data, status=status.HTTP_200_OK))
+        except InvalidCursor:
+            return Response({"message": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        except InvalidFilter as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"message": f"Error retrieving posts: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def alist_posts(self, request, filters, url):
+        posts = post_values.values(Post.objects.filter(filters))
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination()
+            paginator.base_url = url
+            page = await paginator.apaginate_queryset(posts, request, view=self)
+            return paginator.get_paginated_data(post_values.to_representation(page))
+        return post_values.to_representation([post async for post in posts])
+
+    @inherit_schema(PostView.post)
+    async def post(self, request):
+        """
+        Create a new post.
+        """
+        try:
+            serializer = PostSerializer(data=request.data)
+            if serializer.is_valid():
+                serializer.instance = await sync_to_async(create_post)(
+                    model_user(request.user), serializer.validated_data
+                )
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"message": f"Error creating post: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# View to handle a single Post
+class PostDetailView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {
+        'GET': 'post.view',
+        'DELETE': 'post.delete',
+    }
+
+    @swagger_auto_schema(
+        operation_id="Retrieve Post",
+        operation_description=(
+            "Retrieve a post with its comment count and its first comments (oldest first). "
+            "`comments_next` links to the remaining comments."
+        ),
+        manual_parameters=[
+            openapi.Parameter('comments', openapi.IN_QUERY, description="Number of comments to embed (capped by the server).", type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Post retrieved successfully.",
+                examples={
+                    "application/json": {
+                        "id": 1,
+                        "title": "Sample Post",
+                        "content": "This is a sample post.",
+                        "created_by": "username",
+                        "created_at": "2024-12-01T12:34:56Z",
+                        "comment_count": 1,
+                        "comments": [
+                            {
+                                "id": 1,
+                                "post": 1,
+                                "content": "This is a comment.",
+                                "created_by": "username",
+                                "created_at": "2024-12-01T12:34:56Z"
+                            }
+                        ],
+                        "comments_next": None
+                    }
+                }
+            ),
+            404: openapi.Response(
+                description="Post not found.",
+                examples={
+                    "application/json": {
+                        "message": "Post not found."
+                    }
+                }
+            ),
+            500: openapi.Response(
+                description="Error retrieving post.",
+                examples={
+                    "application/json": {
+                        "message": "Error retrieving post: <error_details>"
+                    }
+                }
+            ),
+        }
+    )
+    def get(self, request, pk):
+        """
+        Retrieve a post with its first comments.
+        """
+        try:
+            limit = CommentKeysetPagination().get_page_size(request, 'comments')
+            post = Post.objects.with_author().with_comments(limit).get(pk=pk)
+            serializer = PostDetailSerializer(post, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Post.DoesNotExist:
+            return Response({"message": "Post not found."}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"message": f"Error retrieving post: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @swagger_auto_schema(
         operation_id="Delete Post",
         operation_description="Delete a post by its ID. Only the admin or the creator of the post can delete it.",
@@ -143,19 +366,159 @@ class PostView(APIView):
         Delete a post. Only the admin or the post's creator can delete the post.
         """
         try:
-            post = Post.objects.get(pk=pk)
-            if request.user.role != 'admin' and request.user != post.created_by:
+            post = Post.objects.only('id', 'created_by_id').get(pk=pk)
+            # Token claims may be stale, so authorize against the real row.
+            user = User.objects.only('id', 'role').get(pk=request.user.pk, is_active=True)
+            if not engine.has_object_perm(user, 'post.delete', post):
                 return Response({"message": "You cannot delete this post."}, status=status.HTTP_403_FORBIDDEN)
-            post.delete()
+            delete_post(post)
             return Response({"message": "Post deleted successfully"}, status=status.HTTP_200_OK)
         except Post.DoesNotExist:
             return Response({"message": "Post not found."}, status=status.HTTP_404_NOT_FOUND)
+        except User.DoesNotExist:
+            return Response({"message": "You cannot delete this post."}, status=status.HTTP_403_FORBIDDEN)
         except Exception as e:
             return Response({"message": f"Error deleting post: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# View to page through a Post's comments
+class PostCommentsView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {
+        'GET': 'comment.view',
+    }
+
+    @swagger_auto_schema(
+        operation_id="Retrieve Post Comments",
+        operation_description="Retrieve a keyset-paginated page of a post's comments, oldest first.",
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor from a previous page's `next` link.", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of comments per page (capped by the server).", type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Comments retrieved successfully.",
+                examples={
+                    "application/json": {
+                        "next": None,
+                        "results": [
+                            {
+                                "id": 1,
+                                "post": 1,
+                                "content": "This is a comment.",
+                                "created_by": "username",
+                                "created_at": "2024-12-01T12:34:56Z"
+                            }
+                        ]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="Invalid cursor.",
+                examples={
+                    "application/json": {
+                        "message": "Invalid cursor."
+                    }
+                }
+            ),
+        }
+    )
+    def get(self, request, pk):
+        """
+        Retrieve one page of a post's comments.
+        """
+        try:
+            paginator = CommentKeysetPagination()
+            comments = comment_values.values(Comment.objects.filter(post_id=pk))
+            page = paginator.paginate_queryset(comments, request, view=self)
+            return paginator.get_paginated_response(comment_values.to_representation(page))
+        except InvalidCursor:
+            return Response({"message": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"message": f"Error retrieving comments: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Full-text search
+class SearchView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {
+        'GET': 'post.view',
+    }
+    serializers = {
+        'posts': PostSearchSerializer,
+        'comments': CommentSearchSerializer,
+    }
+
+    @swagger_auto_schema(
+        operation_id="Search",
+        operation_description=(
+            "Full-text search over post titles and contents, or comment contents. "
+            "Results are ranked (title matches first) and paginated with `page`."
+        ),
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search terms.", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('type', openapi.IN_QUERY, description="What to search.", type=openapi.TYPE_STRING, enum=list(search.KINDS), default='posts'),
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number, starting at 1.", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of results per page (capped by the server).", type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Matches, best first.",
+                examples={
+                    "application/json": {
+                        "next": "http://localhost:8000/blog/search/?q=django&page=2&page_size=20",
+                        "results": [
+                            {
+                                "id": 1,
+                                "title": "Sample Post",
+                                "content": "This is a sample post about Django.",
+                                "created_by": "username",
+                                "created_at": "2024-12-01T12:34:56Z",
+                                "rank": 0.6079
+                            }
+                        ]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="Missing query or unknown type.",
+                examples={
+                    "application/json": {
+                        "message": "Query parameter 'q' is required."
+                    }
+                }
+            ),
+            403: openapi.Response(
+                description="Your role does not allow this action."
+            ),
+        }
+    )
+    def get(self, request):
+        """
+        Search posts or comments.
+        """
+        query = request.query_params.get('q', '').strip()
+        kind = request.query_params.get('type', 'posts')
+        if not query:
+            return Response({"message": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if kind not in search.KINDS:
+            return Response({"message": f"Unknown type: {kind}"}, status=status.HTTP_400_BAD_REQUEST)
+        if kind == 'comments' and not engine.has_perm(request.user.role, 'comment.view'):
+            return Response({"message": RolePermission.message}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            paginator = SearchPagination()
+            page = paginator.paginate_results(
+                lambda limit, offset: search.search(kind, query, limit, offset), request,
+            )
+            serializer = self.serializers[kind](page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        except Exception as e:
+            return Response({"message": f"Error searching: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # Comment View
 class CommentView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {
+        'POST': 'comment.create',
+    }
 
     @swagger_auto_schema(
         operation_id="Create Comment",
@@ -174,6 +537,9 @@ class CommentView(APIView):
                     }
                 }
             ),
+            202: openapi.Response(
+                description="Comment queued for writing (COMMENT_WRITE_BEHIND mode 'ack', or 'sync' past its WAIT_TIMEOUT); it is stored shortly after.",
+            ),
             400: openapi.Response(
                 description="Validation errors occurred.",
                 examples={
@@ -183,6 +549,14 @@ class CommentView(APIView):
                     }
                 }
             ),
+            503: openapi.Response(
+                description="Too many comments are waiting to be written.",
+                examples={
+                    "application/json": {
+                        "message": "Too many comments are waiting to be written, try again later."
+                    }
+                }
+            ),
             500: openapi.Response(
                 description="Error creating comment.",
                 examples={
@@ -200,8 +574,198 @@ class CommentView(APIView):
         try:
             serializer = CommentSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save(created_by=request.user)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                serializer.instance, stored = comment_writer.create(model_user(request.user), **serializer.validated_data)
+                return Response(serializer.data, status=status.HTTP_201_CREATED if stored else status.HTTP_202_ACCEPTED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except WriterBusy as e:
+            return Response({"message": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({"message": f"Error creating comment: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Async variant of CommentView, served when settings.ASYNC_VIEWS is on
+class AsyncCommentView(AsyncAPIView, CommentView):
+
+    @inherit_schema(CommentView.post)
+    async def post(self, request):
+        """
+        Create a new comment.
+        """
+        try:
+            # Validate the post id with an async query rather than through
+            # the serializer's (synchronous) related field lookup.
+            serializer = BulkCommentSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            post_id = serializer.validated_data['post']
+            if not await Post.objects.filter(pk=post_id).aexists():
+                return Response({"post": [f'Invalid pk "{post_id}" - object does not exist.']}, status=status.HTTP_400_BAD_REQUEST)
+            comment, stored = await comment_writer.acreate(
+                model_user(request.user), post_id=post_id, content=serializer.validated_data['content'],
+            )
+            return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED if stored else status.HTTP_202_ACCEPTED)
+        except WriterBusy as e:
+            return Response({"message": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({"message": f"Error creating comment: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Bulk ingestion views
+class BulkIngestView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    parser_classes = [FastJSONParser, NDJSONParser]
+    ingest_class = None
+
+    def get_batch_size(self, request):
+        try:
+            batch_size = int(request.query_params.get('batch_size', settings.BLOG_BULK_BATCH_SIZE))
+        except ValueError:
+            batch_size = settings.BLOG_BULK_BATCH_SIZE
+        return max(1, min(batch_size, settings.BLOG_BULK_MAX_BATCH_SIZE))
+
+    def ingest(self, request, label):
+        try:
+            rows = request.data
+            if isinstance(rows, dict):
+                return Response({"message": f"Expected a list of {label}."}, status=status.HTTP_400_BAD_REQUEST)
+            ingest = self.ingest_class(model_user(request.user), batch_size=self.get_batch_size(request)).run(rows)
+            return Response(ingest.summary(), status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"message": f"Error creating comment: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"message": f"Error creating {label}: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+bulk_batch_size_parameter = openapi.Parameter(
+    'batch_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+    description="Rows per INSERT batch (capped by the server).",
+)
+
+bulk_responses = {
+    200: openapi.Response(
+        description="Rows processed. Only the first failures are listed.",
+        examples={
+            "application/json": {
+                "created": 2,
+                "failed": 1,
+                "errors": [{"row": 1, "errors": {"title": ["This field is required."]}}],
+                "errors_truncated": False
+            }
+        }
+    ),
+    400: openapi.Response(
+        description="The body is not a list.",
+        examples={
+            "application/json": {
+                "message": "Expected a list of posts."
+            }
+        }
+    ),
+}
+
+
+class PostBulkView(BulkIngestView):
+    required_permissions = {'POST': 'post.bulk_create'}
+    ingest_class = PostIngest
+
+    @swagger_auto_schema(
+        operation_id="Bulk Create Posts",
+        operation_description=(
+            "Create many posts (admin only) from a JSON array or a streamed "
+            "`application/x-ndjson` body with one post per line."
+        ),
+        request_body=PostSerializer(many=True),
+        manual_parameters=[bulk_batch_size_parameter],
+        responses=bulk_responses,
+    )
+    def post(self, request):
+        """
+        Create posts in batches.
+        """
+        return self.ingest(request, "posts")
+
+
+class CommentBulkView(BulkIngestView):
+    required_permissions = {'POST': 'comment.bulk_create'}
+    ingest_class = CommentIngest
+
+    @swagger_auto_schema(
+        operation_id="Bulk Create Comments",
+        operation_description=(
+            "Create many comments (admin only) from a JSON array or a streamed "
+            "`application/x-ndjson` body with one comment per line."
+        ),
+        request_body=CommentSerializer(many=True),
+        manual_parameters=[bulk_batch_size_parameter],
+        responses=bulk_responses,
+    )
+    def post(self, request):
+        """
+        Create comments in batches.
+        """
+        return self.ingest(request, "comments")
+
+
+# Export View
+class ExportView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {'GET': 'blog.export'}
+
+    content_types = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+
+    @swagger_auto_schema(
+        operation_id="Export Posts or Comments",
+        operation_description=(
+            "Stream every post or comment (admin only) as NDJSON or CSV, optionally gzipped "
+            "and filtered by creation time and author. Rows are read with a server-side cursor, "
+            "so exports of any size use constant memory."
+        ),
+        manual_parameters=[
+            openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['ndjson', 'csv'], description="Output format (default ndjson)."),
+            openapi.Parameter('gzip', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description="Gzip the output."),
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Only rows created at or after this ISO date/datetime."),
+            openapi.Parameter('until', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Only rows created at or before this ISO date/datetime."),
+            openapi.Parameter('author', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Author email or id."),
+        ],
+        responses={
+            200: openapi.Response(description="Export stream."),
+            400: openapi.Response(
+                description="Invalid parameters.",
+                examples={
+                    "application/json": {
+                        "message": "Invalid date: yesterday"
+                    }
+                }
+            ),
+        }
+    )
+    def get(self, request, kind):
+        """
+        Stream an export of posts or comments.
+        """
+        params = request.query_params
+        output = params.get('output', 'ndjson')
+        compress = params.get('gzip', '').lower() in ('1', 'true', 'yes')
+        try:
+            chunks = export_stream(
+                kind,
+                output=output,
+                compress=compress,
+                since=params.get('since'),
+                until=params.get('until'),
+                author=params.get('author'),
+            )
+        except InvalidExport as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if isinstance(request._request, ASGIRequest):
+            # Otherwise the ASGI handler would buffer the whole export.
+            chunks = iterate_in_thread(chunks)
+
+        filename = f"{kind}.{output}"
+        content_type = self.content_types[output]
+        if compress:
+            filename += ".gz"
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,259 @@
+"""
+Write-behind batching for comment creation.
+
+With MODE 'off' every comment is one INSERT and one commit in its own
+request. In the 'sync' and 'ack' modes CommentView hands the validated
+comment, already carrying its id and created_at, to a per-process
+CommentWriter. Its background thread inserts what has queued up with one
+bulk_create and one transaction per batch, flushing when MAX_BATCH
+comments are waiting or MAX_DELAY_MS after the first of them arrived.
+
+'sync' answers 201 once the batch holding the comment has committed, so
+a burst costs one commit per batch with the same durability as before.
+If that takes longer than WAIT_TIMEOUT it answers 202 instead, like 'ack'.
+'ack' answers 202 as soon as the comment is queued; comments still queued
+when the process dies are lost.
+
+Because created_at is assigned before the insert, a comment may become
+visible slightly after newer ones, by at most the flush delay.
+"""
+
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from .cache import post_list_cache
+from .counters import count_created, create_comment
+from .models import Post, Comment
+from .search import index_objects, search_vector
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'sync', 'ack')
+
+
+class WriterBusy(Exception):
+    """
+    Raised when the write-behind queue is full.
+    """
+
+
+class CommentWriter:
+    def __init__(self, mode='off', max_batch=500, max_delay=0.01, max_queue=10_000, wait_timeout=5,
+                 background=True):
+        if mode not in MODES:
+            raise ValueError(f"Unknown write-behind mode {mode!r}; expected one of {', '.join(MODES)}.")
+        self.mode = mode
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.wait_timeout = wait_timeout
+        self.background = background
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'COMMENT_WRITE_BEHIND', {})
+        return cls(
+            mode=options.get('MODE', 'off'),
+            max_batch=options.get('MAX_BATCH', 500),
+            max_delay=options.get('MAX_DELAY_MS', 10) / 1000,
+            max_queue=options.get('MAX_QUEUE', 10_000),
+            wait_timeout=options.get('WAIT_TIMEOUT', 5),
+        )
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def build(self, user, **fields):
+        comment = Comment(created_by=user, **fields)
+        comment.search_vector = search_vector(comment)
+        return comment
+
+    def submit(self, comment, block=True):
+        """
+        Queue `comment` for the next batch. Returns a Future resolved with
+        the comment once it is committed, or with the insert's error.
+        """
+        future = Future()
+        try:
+            self._queue.put((comment, future), block=block, timeout=self.wait_timeout)
+        except queue.Full:
+            raise WriterBusy("Too many comments are waiting to be written, try again later.") from None
+        self.queued += 1
+        if self.background:
+            self._ensure_thread()
+        return future
+
+    def create(self, user, **fields):
+        """
+        Create a comment the configured way. Returns (comment, stored):
+        `stored` is False when the comment is only queued.
+        """
+        if not self.enabled:
+            return create_comment(user, **fields), True
+        comment = self.build(user, **fields)
+        future = self.submit(comment)
+        if self.mode == 'sync':
+            try:
+                return future.result(timeout=self.wait_timeout), True
+            except FutureTimeout:
+                pass
+        return self.queued_only(comment, future)
+
+    async def acreate(self, user, **fields):
+        if not self.enabled:
+            return await sync_to_async(create_comment)(user, **fields), True
+        comment = self.build(user, **fields)
+        # Never block the event loop on a full queue.
+        future = self.submit(comment, block=False)
+        if self.mode == 'sync':
+            try:
+                # shield() keeps the timeout from cancelling the write.
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.wait_timeout), True
+            except asyncio.TimeoutError:
+                pass
+        return self.queued_only(comment, future)
+
+    def queued_only(self, comment, future):
+        """
+        Answer for a comment nobody waits for: if writing it fails later,
+        the log is the only place that says so.
+        """
+        def log_failure(future):
+            if future.exception() is not None:
+                logger.error("Dropped queued comment %s: %s", comment.pk, future.exception())
+
+        future.add_done_callback(log_failure)
+        return comment, False
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='comment-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            close_old_connections()
+            try:
+                self.write(batch)
+            except Exception as e:
+                logger.exception("Write-behind batch of %d comments failed", len(batch))
+                self.fail(batch, e)
+
+    def flush(self):
+        """
+        Write everything queued so far in the calling thread. Returns the
+        number of comments written.
+        """
+        written = self.written
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return self.written - written
+            self.write(batch)
+
+    def write(self, batch):
+        batch = self.check_posts(batch)
+        if not batch:
+            return
+        comments = [comment for comment, _ in batch]
+        try:
+            with transaction.atomic():
+                Comment.objects.bulk_create(comments)
+                count_created(comments)
+            saved = batch
+        except IntegrityError:
+            # A post deleted since check_posts(); foreign keys are checked
+            # at commit, so retry each comment in its own transaction.
+            saved = self.write_one_by_one(batch)
+        self.batches += 1
+        self.written += len(saved)
+        # The comments are committed: nothing below may fail them.
+        try:
+            # bulk_create sends no post_save signals.
+            index_objects([comment for comment, _ in saved])
+            post_list_cache.invalidate()
+        except Exception:
+            logger.exception("Post-commit steps failed for a batch of %d comments", len(saved))
+        for comment, future in saved:
+            future.set_result(comment)
+
+    def check_posts(self, batch):
+        """
+        Fail the comments whose post was deleted after they were queued:
+        one query per batch.
+        """
+        post_ids = {comment.post_id for comment, _ in batch}
+        existing = set(Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True))
+        checked = []
+        for comment, future in batch:
+            if comment.post_id in existing:
+                checked.append((comment, future))
+            else:
+                self.fail([(comment, future)], Post.DoesNotExist(f'Post {comment.post_id} no longer exists.'))
+        return checked
+
+    def write_one_by_one(self, batch):
+        saved = []
+        for comment, future in batch:
+            try:
+                with transaction.atomic():
+                    comment.save(force_insert=True)
+                    count_created([comment])
+            except IntegrityError as e:
+                self.fail([(comment, future)], e)
+                continue
+            saved.append((comment, future))
+        return saved
+
+    def fail(self, batch, error):
+        self.failed += len(batch)
+        for comment, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+
+comment_writer = CommentWriter.from_settings()
+
+
+@atexit.register
+def _flush_at_exit():
+    # Best effort for 'ack' mode on a clean shutdown.
+    if comment_writer.enabled and comment_writer.queued > comment_writer.written + comment_writer.failed:
+        try:
+            comment_writer.flush()
+        except Exception:
+            logger.exception("Could not flush queued comments at exit")
@@ -7,6 +7,9 @@ import sys
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'RBAC_Project.settings')
+    # Development, tests and load tests; set SETTINGS_PROFILE=production to
+    # run commands such as migrate against the production database.
+    os.environ.setdefault('SETTINGS_PROFILE', 'local')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
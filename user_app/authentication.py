@@ -0,0 +1,98 @@
+import uuid
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User, load_token_state, token_state_cache, token_state_cache_key
+
+CLAIMS = ('email', 'role', 'token_version')
+
+MISSING = object()
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built entirely from access token claims.
+    """
+
+    @cached_property
+    def id(self):
+        return uuid.UUID(str(self.token[api_settings.USER_ID_CLAIM]))
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def email(self):
+        return self.token['email']
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @cached_property
+    def token_version(self):
+        return self.token['token_version']
+
+    def __str__(self):
+        return self.email
+
+    def as_model(self):
+        """
+        Return an in-memory User with the claimed fields, good enough to be
+        assigned to a foreign key or rendered with str(). Never save it.
+        """
+        user = User(id=self.id, email=self.email, role=self.role, token_version=self.token_version)
+        user._state.adding = False
+        user._state.db = DEFAULT_DB_ALIAS
+        return user
+
+
+def model_user(user):
+    """
+    Return a User instance for `user` without querying the database.
+    """
+    if isinstance(user, ClaimsUser):
+        return user.as_model()
+    return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the role/email claims embedded by
+    RBACRefreshToken instead of loading the user row on every request.
+
+    The user's current (token_version, is_active) comes from the token
+    state cache (TOKEN_STATE_CACHE), shared by every process, and is read
+    from the database only when the cache has no entry for the user.
+    Tokens are rejected once their token_version falls behind the current
+    one, which User.revoke_tokens() bumps on every role or is_active
+    change, and inactive or deleted users are rejected like simplejwt
+    does. Tokens issued before the claims existed fall back to the regular
+    database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = ClaimsUser(validated_token)
+        state = token_state_cache().get(token_state_cache_key(user.id), MISSING)
+        if state is MISSING:
+            state = load_token_state(user.id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        current_version, is_active = state
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if user.token_version < current_version:
+            raise InvalidToken(_("Token has been revoked"))
+        return user
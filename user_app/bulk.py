@@ -0,0 +1,112 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from RBAC_Project.ndjson import InvalidLine, chunked
+from .hashing import hash_passwords
+from .models import User
+from .serializers import BulkUserSerializer
+
+
+class BulkRegistration:
+    """
+    Registers users from an iterable of rows, one chunk at a time:
+    field validation per row, one query per chunk for existing emails and
+    usernames, parallel hashing, and one bulk_create per chunk inside its
+    own transaction. `results` holds one entry per input row.
+    """
+
+    def __init__(self, chunk_size=None, max_rows=None):
+        self.chunk_size = chunk_size or settings.BULK_REGISTER_CHUNK_SIZE
+        self.max_rows = max_rows or settings.BULK_REGISTER_MAX_ROWS
+        self.results = []
+        self.created = 0
+        self.failed = 0
+
+    def fail(self, row, errors):
+        self.failed += 1
+        self.results.append({'row': row, 'status': 'error', 'errors': errors})
+
+    def run(self, rows):
+        numbered = enumerate(islice(rows, self.max_rows + 1))
+        for chunk in chunked(numbered, self.chunk_size):
+            if chunk[-1][0] >= self.max_rows:
+                overflow = chunk.pop()
+                self.process_chunk(chunk)
+                self.fail(overflow[0], {'non_field_errors': [f'Only {self.max_rows} rows are accepted per request.']})
+                break
+            self.process_chunk(chunk)
+        self.results.sort(key=lambda result: result['row'])
+        return self
+
+    def validate(self, chunk):
+        valid = []
+        for row, data in chunk:
+            if isinstance(data, InvalidLine):
+                self.fail(row, {'non_field_errors': [data.message]})
+                continue
+            serializer = BulkUserSerializer(data=data)
+            if not serializer.is_valid():
+                self.fail(row, serializer.errors)
+                continue
+            valid.append((row, serializer.validated_data))
+        return valid
+
+    def deduplicate(self, valid):
+        emails = {data['email'] for _, data in valid}
+        usernames = {data['username'] for _, data in valid}
+        existing = User.objects.filter(Q(email__in=emails) | Q(username__in=usernames)).values_list('email', 'username')
+        taken_emails = set()
+        taken_usernames = set()
+        for email, username in existing:
+            taken_emails.add(email)
+            taken_usernames.add(username)
+
+        unique = []
+        for row, data in valid:
+            errors = {}
+            if data['email'] in taken_emails:
+                errors['email'] = ['user with this email already exists.']
+            if data['username'] in taken_usernames:
+                errors['username'] = ['A user with that username already exists.']
+            if errors:
+                self.fail(row, errors)
+                continue
+            taken_emails.add(data['email'])
+            taken_usernames.add(data['username'])
+            unique.append((row, data))
+        return unique
+
+    def process_chunk(self, chunk):
+        if not chunk:
+            return
+        unique = self.deduplicate(self.validate(chunk))
+        if not unique:
+            return
+        hashes = hash_passwords([data['password'] for _, data in unique])
+        users = [User(**{**data, 'password': encoded}) for (_, data), encoded in zip(unique, hashes)]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            created = list(zip(unique, users))
+        except IntegrityError:
+            # Lost a race with another registration; find the offending rows.
+            created = self.insert_one_by_one(unique, users)
+        for (row, data), user in created:
+            self.created += 1
+            self.results.append({'row': row, 'status': 'created', 'id': str(user.id)})
+
+    def insert_one_by_one(self, unique, users):
+        created = []
+        with transaction.atomic():
+            for (row, data), user in zip(unique, users):
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                except IntegrityError:
+                    self.fail(row, {'non_field_errors': ['A user with this email or username already exists.']})
+                    continue
+                created.append(((row, data), user))
+        return created
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with the iteration count taken from PASSWORD_PBKDF2_ITERATIONS.
+    Hashes made with a different count are rehashed on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with its cost parameters taken from PASSWORD_ARGON2. Requires
+    the optional argon2-cffi package.
+    """
+
+    def _option(self, name, default):
+        return getattr(settings, 'PASSWORD_ARGON2', {}).get(name, default)
+
+    @property
+    def time_cost(self):
+        return self._option('TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return self._option('MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return self._option('PARALLELISM', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+class HashingBusy(Exception):
+    """
+    Raised when the password hashing pool has no free slot in time.
+    """
+
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing.
+
+    hashlib's PBKDF2 and argon2-cffi release the GIL, so hashing runs in
+    parallel with request handling. At most `workers + queue_size` jobs
+    may be pending; beyond that callers wait up to `wait_timeout` seconds
+    and then get HashingBusy instead of piling up behind the CPU.
+    """
+
+    def __init__(self, workers, queue_size, wait_timeout):
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            workers=settings.PASSWORD_HASH_WORKERS,
+            queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+            wait_timeout=settings.PASSWORD_HASH_WAIT_TIMEOUT,
+        )
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise HashingBusy("Password hashing is overloaded, try again later.")
+        return self._submit_acquired(fn, *args)
+
+    def _submit_acquired(self, fn, *args):
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """
+        Like run(), but awaits the result instead of blocking the event
+        loop. Waiting for a free slot happens in a thread for the same reason.
+        """
+        if not self._slots.acquire(blocking=False):
+            if not await asyncio.to_thread(self._slots.acquire, timeout=self.wait_timeout):
+                raise HashingBusy("Password hashing is overloaded, try again later.")
+        return await asyncio.wrap_future(self._submit_acquired(fn, *args))
+
+
+pool = HashingPool.from_settings()
+
+_process_pool = None
+
+
+def _init_process_worker():
+    django.setup()
+
+
+def get_process_pool():
+    """
+    Lazily start the process pool used for bulk hashing. Workers are
+    spawned rather than forked, which keeps it safe in threaded servers.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.BULK_REGISTER_HASH_PROCESSES,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process_worker,
+        )
+    return _process_pool
+
+
+def _check(raw_password, encoded):
+    is_correct, must_update = verify_password(raw_password, encoded)
+    upgraded = make_password(raw_password) if is_correct and must_update else None
+    return is_correct, upgraded
+
+
+def hash_password(raw_password):
+    return pool.run(make_password, raw_password)
+
+
+def check_user_password(user, raw_password):
+    """
+    Verify `raw_password` for `user` on the hashing pool. If the stored
+    hash uses outdated parameters it is transparently replaced.
+    """
+    is_correct, upgraded = pool.run(_check, raw_password, user.password)
+    if upgraded is not None:
+        user.password = upgraded
+        type(user).objects.filter(pk=user.pk).update(password=upgraded)
+    return is_correct
+
+
+async def acheck_user_password(user, raw_password):
+    """
+    Async check_user_password().
+    """
+    is_correct, upgraded = await pool.arun(_check, raw_password, user.password)
+    if upgraded is not None:
+        user.password = upgraded
+        await type(user).objects.filter(pk=user.pk).aupdate(password=upgraded)
+    return is_correct
+
+
+def hash_passwords(passwords):
+    """
+    Hash many passwords in parallel, in the process pool when
+    BULK_REGISTER_HASH_PROCESSES is set and on the thread pool otherwise.
+    """
+    processes = settings.BULK_REGISTER_HASH_PROCESSES
+    if processes:
+        chunksize = max(1, len(passwords) // (processes * 4))
+        return list(get_process_pool().map(make_password, passwords, chunksize=chunksize))
+    futures = [pool.submit(make_password, password) for password in passwords]
+    return [future.result() for future in futures]
@@ -0,0 +1,65 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from RBAC_Project.benchmarking import benchmark_database, summarize, timed
+from user_app.hashing import hash_password
+from user_app.models import User
+
+
+class Command(BaseCommand):
+    help = "Benchmark LoginView latency and throughput with the configured password hasher profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=settings.PASSWORD_HASH_WORKERS)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        password = 'bench-password-123'
+        encoded = hash_password(password)
+        User.objects.bulk_create([
+            User(email=f'bench{i}@example.com', username=f'bench{i}', password=encoded)
+            for i in range(options['users'])
+        ])
+        url = reverse('login')
+
+        def login(i):
+            email = f"bench{i % options['users']}@example.com"
+            elapsed, response = timed(
+                Client(REMOTE_ADDR=f'10.0.{i >> 8 & 255}.{i & 255}').post,
+                url, {'email': email, 'password': password}, content_type='application/json',
+            )
+            assert response.status_code == 200, response.content
+            return elapsed
+
+        start = time.perf_counter()
+        sequential = [login(i) for i in range(options['logins'])]
+        sequential_stats = summarize(sequential, time.perf_counter() - start)
+
+        concurrency = options['concurrency']
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            concurrent = list(executor.map(login, range(options['logins'])))
+        concurrent_stats = summarize(concurrent, time.perf_counter() - start)
+        cores = min(concurrency, settings.PASSWORD_HASH_WORKERS, os.cpu_count() or 1)
+
+        self.stdout.write(f"profile: {settings.PASSWORD_HASH_PROFILE} ({settings.PASSWORD_HASHERS[0]})")
+        self.stdout.write(
+            f"sequential:  p50 {sequential_stats['p50_ms']:.1f} ms  p99 {sequential_stats['p99_ms']:.1f} ms  "
+            f"{sequential_stats['rps']:.1f} logins/s"
+        )
+        self.stdout.write(
+            f"concurrent ({concurrency}): p50 {concurrent_stats['p50_ms']:.1f} ms  "
+            f"p99 {concurrent_stats['p99_ms']:.1f} ms  {concurrent_stats['rps']:.1f} logins/s  "
+            f"{concurrent_stats['rps'] / cores:.1f} logins/s/core"
+        )
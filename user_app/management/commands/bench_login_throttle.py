@@ -0,0 +1,120 @@
+import json
+import logging
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from RBAC_Project.benchmarking import benchmark_database, call_wsgi, summarize, timed
+from user_app.hashing import hash_password
+from user_app.models import User
+from user_app.throttling import login_throttle
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure legitimate login latency while attacker threads try wrong passwords against other "
+        "accounts at a fixed rate, with the login throttle off and on."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=100)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--attackers', type=int, default=4, help="Attacker threads, one source IP each.")
+        parser.add_argument('--attack-rate', type=float, default=100, help="Attempts per second, all attackers together.")
+        parser.add_argument('--victims', type=int, default=50, help="Accounts the attackers guess passwords for.")
+        parser.add_argument('--warmup', type=float, default=5, help="Seconds of attack before measuring.")
+        parser.add_argument('--pbkdf2-iterations', type=int, default=100_000,
+                            help="Hashing cost: enough to make each guess expensive, low enough to keep the run short.")
+
+    def handle(self, *args, **options):
+        # Every rejected guess would otherwise log a warning.
+        logging.disable(logging.WARNING)
+        try:
+            with benchmark_database(), override_settings(PASSWORD_PBKDF2_ITERATIONS=options['pbkdf2_iterations']):
+                self.run(options)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def run(self, options):
+        password = 'bench-password-123'
+        encoded = hash_password(password)
+        User.objects.bulk_create([
+            User(email=f'bench{i}@example.com', username=f'bench{i}', password=encoded)
+            for i in range(options['users'])
+        ] + [
+            User(email=f'victim{i}@example.com', username=f'victim{i}', password=encoded)
+            for i in range(options['victims'])
+        ])
+        url = reverse('login')
+
+        def legitimate():
+            # Every user logs in from their own address.
+            latencies = []
+            start = time.perf_counter()
+            for i in range(options['logins']):
+                n = i % options['users']
+                elapsed, response = timed(
+                    Client(REMOTE_ADDR=f'10.0.0.{n}').post,
+                    url, {'email': f'bench{n}@example.com', 'password': password}, content_type='application/json',
+                )
+                assert response.status_code == 200, response.content
+                latencies.append(elapsed)
+            return summarize(latencies, time.perf_counter() - start)
+
+        handler = WSGIHandler()
+
+        def attack(n, stop, statuses):
+            # Straight into the WSGI handler, so the attacker's own client
+            # costs as little CPU as possible; paced to its share of
+            # --attack-rate, or as fast as the server answers once it can't
+            # keep up.
+            interval = options['attackers'] / options['attack_rate']
+            next_at = time.perf_counter()
+            i = 0
+            while not stop.wait(max(0.0, next_at - time.perf_counter())):
+                email = f"victim{(i * options['attackers'] + n) % options['victims']}@example.com"
+                body = json.dumps({'email': email, 'password': f'guess-{i}'}).encode()
+                statuses.append(call_wsgi(handler, 'POST', url, body=body, REMOTE_ADDR=f'203.0.113.{n}'))
+                next_at += interval
+                i += 1
+
+        def phase(attackers, throttled):
+            login_throttle.reset()
+            login_throttle.enabled = throttled
+            stop = threading.Event()
+            statuses = []
+            threads = [threading.Thread(target=attack, args=(n, stop, statuses)) for n in range(attackers)]
+            for thread in threads:
+                thread.start()
+            try:
+                # Measure the steady state, once the attackers' initial
+                # bursts are spent.
+                time.sleep(options['warmup'] if attackers else 0)
+                stats = legitimate()
+            finally:
+                stop.set()
+                for thread in threads:
+                    thread.join()
+            return stats, statuses
+
+        enabled = login_throttle.enabled
+        try:
+            phases = [
+                ('no attack', phase(0, True)),
+                ('attack, throttle off', phase(options['attackers'], False)),
+                ('attack, throttle on', phase(options['attackers'], True)),
+            ]
+        finally:
+            login_throttle.enabled = enabled
+            login_throttle.reset()
+
+        self.stdout.write(f"{'':22}{'p50 ms':>8}{'p99 ms':>9}{'logins/s':>10}{'attempts':>10}{'hashed':>8}{'429':>7}")
+        for name, (stats, statuses) in phases:
+            self.stdout.write(
+                f"{name:22}{stats['p50_ms']:8.1f}{stats['p99_ms']:9.1f}{stats['rps']:10.1f}"
+                f"{len(statuses):10}{statuses.count(401):8}{statuses.count(429):7}"
+            )
@@ -0,0 +1,47 @@
+import time
+import uuid
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user_app.permissions import PERMISSIONS, engine
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the compiled RBAC permission engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--decisions', type=int, default=1_000_000)
+        parser.add_argument(
+            '--min-rate', type=float, default=1_000_000,
+            help="Fail if fewer decisions per second than this are made; 0 only reports.",
+        )
+
+    def handle(self, *args, **options):
+        count = options['decisions']
+        roles = list(engine.masks)
+        owner_id = uuid.uuid4()
+        users = [SimpleNamespace(role=role, pk=owner_id) for role in roles]
+        obj = SimpleNamespace(created_by_id=owner_id)
+        cases = [(role, permission) for role in roles for permission in PERMISSIONS]
+        object_cases = [(user, permission) for user in users for permission in PERMISSIONS]
+
+        has_perm = engine.has_perm
+        start = time.perf_counter()
+        for i in range(count):
+            role, permission = cases[i % len(cases)]
+            has_perm(role, permission)
+        role_rate = count / (time.perf_counter() - start)
+
+        has_object_perm = engine.has_object_perm
+        start = time.perf_counter()
+        for i in range(count):
+            user, permission = object_cases[i % len(object_cases)]
+            has_object_perm(user, permission, obj)
+        object_rate = count / (time.perf_counter() - start)
+
+        self.stdout.write(f"role decisions:   {role_rate:,.0f}/s")
+        self.stdout.write(f"object decisions: {object_rate:,.0f}/s")
+
+        if min(role_rate, object_rate) < options['min_rate']:
+            raise CommandError(f"Permission checks are below {options['min_rate']:,.0f} decisions/s.")
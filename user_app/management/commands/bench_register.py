@@ -0,0 +1,50 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from RBAC_Project.benchmarking import benchmark_database
+from user_app.models import User
+from user_app.tokens import RBACRefreshToken
+
+
+class Command(BaseCommand):
+    help = "Compare one-by-one RegisterView throughput with the bulk registration endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options['users'])
+
+    def rows(self, prefix, count):
+        return [
+            {'email': f'{prefix}{i}@example.com', 'username': f'{prefix}{i}', 'password': 'bench-password-123'}
+            for i in range(count)
+        ]
+
+    def run(self, count):
+        client = Client()
+
+        start = time.perf_counter()
+        for row in self.rows('single', count):
+            response = client.post(reverse('register'), row, content_type='application/json')
+            assert response.status_code == 201, response.content
+        single_rate = count / (time.perf_counter() - start)
+
+        admin = User.objects.create(email='bench-admin@example.com', username='bench-admin', role='admin')
+        token = RBACRefreshToken.for_user(admin).access_token
+        body = '\n'.join(json.dumps(row) for row in self.rows('bulk', count))
+        start = time.perf_counter()
+        response = client.post(
+            reverse('register_bulk'), body, content_type='application/x-ndjson',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        bulk_rate = count / (time.perf_counter() - start)
+        assert response.json()['created'] == count, response.content
+
+        self.stdout.write(f"one-by-one: {single_rate:.1f} users/s")
+        self.stdout.write(f"bulk:       {bulk_rate:.1f} users/s ({bulk_rate / single_rate:.1f}x)")
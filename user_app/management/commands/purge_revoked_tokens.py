@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from user_app.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens that have expired, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        expired = RevokedToken.objects.filter(expires_at__lte=now)
+        total = 0
+        while True:
+            # Short transactions: each batch is one indexed range read and
+            # one primary-key delete.
+            batch = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted, _ = RevokedToken.objects.filter(pk__in=batch).delete()
+            total += deleted
+        self.stdout.write(f"Purged {total} expired revoked tokens.")
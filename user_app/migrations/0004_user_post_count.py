@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_app', '0003_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
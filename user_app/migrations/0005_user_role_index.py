@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_app', '0004_user_post_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'Admin'), ('creator', 'Creator'), ('user', 'User')], db_index=True, default='user', max_length=10),
+        ),
+    ]
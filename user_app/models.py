@@ -1,6 +1,41 @@
 import uuid
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models import F
+
+# Fields whose change revokes the user's outstanding tokens.
+ACCESS_FIELDS = ('role', 'is_active')
+
+
+def token_state_cache():
+    return caches[settings.TOKEN_STATE_CACHE]
+
+
+def token_state_cache_key(user_id):
+    return f'user_app:token_state:{user_id}'
+
+
+def load_token_state(user_id):
+    """
+    Read (token_version, is_active) from the database and publish it to the
+    token state cache; None if the user no longer exists.
+    """
+    state = User.objects.filter(pk=user_id).values_list('token_version', 'is_active').first()
+    token_state_cache().set(token_state_cache_key(user_id), state, timeout=None)
+    return state
+
+
+def forget_token_state(user_id):
+    """
+    Drop the cached token state once the current transaction commits, so
+    that the next authentication reloads the committed row. Writing the
+    new state right away would outlive a rollback.
+    """
+    key = token_state_cache_key(user_id)
+    transaction.on_commit(lambda: token_state_cache().delete(key))
+
 
 class User(AbstractUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -13,7 +48,13 @@ class User(AbstractUser):
             ('user', 'User'),
         ),
         default='user',
+        # For the post list's `role` filter (blog_app.filters).
+        db_index=True,
     )
+    # Embedded in every issued token; bumping it revokes outstanding tokens.
+    token_version = models.PositiveIntegerField(default=0)
+    # Maintained by blog_app.counters.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -21,3 +62,59 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_access = user._access()
+        return user
+
+    def _access(self):
+        # Deferred fields are missing from __dict__ and can't have changed.
+        return {name: self.__dict__[name] for name in ACCESS_FIELDS if name in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        """
+        Saving a new role or is_active revokes the user's tokens, so that
+        stateless authentication stops trusting the role claimed in them.
+        QuerySet.update() bypasses this; call revoke_tokens() after it.
+        """
+        update_fields = kwargs.get('update_fields')
+        saved = {
+            name: value for name, value in self._access().items()
+            if update_fields is None or name in update_fields
+        }
+        loaded = getattr(self, '_loaded_access', {})
+        changed = any(name in loaded and loaded[name] != value for name, value in saved.items())
+        super().save(*args, **kwargs)
+        self._loaded_access = {**loaded, **saved}
+        if changed:
+            self.revoke_tokens()
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        forget_token_state(pk)
+        return result
+
+    def revoke_tokens(self):
+        """
+        Invalidate every token issued to this user so far. Stateless
+        authentication looks the version up in the token state cache, whose
+        entry is dropped when the change commits.
+        """
+        User.objects.filter(pk=self.pk).update(token_version=F('token_version') + 1)
+        self.refresh_from_db(fields=['token_version'])
+        forget_token_state(self.pk)
+
+
+class RevokedToken(models.Model):
+    """
+    Revoked refresh token, keyed by its `jti` claim. Rows are only needed
+    until the token would have expired anyway; see purge_revoked_tokens.
+    """
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.jti
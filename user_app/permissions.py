@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.permissions import BasePermission
+
+# Every permission the API knows about. A permission ending in "_own" is
+# the ownership-scoped variant of the one without the suffix.
+PERMISSIONS = (
+    'post.view',
+    'post.create',
+    'post.delete',
+    'post.delete_own',
+    'comment.view',
+    'comment.create',
+    'post.bulk_create',
+    'comment.bulk_create',
+    'blog.export',
+    'user.bulk_register',
+    'system.metrics',
+)
+
+# Role -> permissions matrix. Override with settings.RBAC_ROLE_PERMISSIONS.
+DEFAULT_ROLE_PERMISSIONS = {
+    'admin': {
+        'post.view', 'post.create', 'post.delete', 'comment.view', 'comment.create',
+        'post.bulk_create', 'comment.bulk_create', 'blog.export', 'user.bulk_register',
+        'system.metrics',
+    },
+    'creator': {'post.view', 'post.create', 'post.delete_own', 'comment.view', 'comment.create'},
+    'user': {'post.view', 'post.create', 'post.delete_own', 'comment.view', 'comment.create'},
+}
+
+OWN_SUFFIX = '_own'
+
+
+class PermissionEngine:
+    """
+    Role -> permission matrix compiled into integer bitmasks, so a decision
+    is two dict lookups and an AND, with no database access.
+    """
+
+    def __init__(self, matrix, permissions=PERMISSIONS):
+        self.bits = {name: 1 << index for index, name in enumerate(permissions)}
+        self.masks = {}
+        for role, granted in matrix.items():
+            mask = 0
+            for name in granted:
+                if name not in self.bits:
+                    raise ImproperlyConfigured(f"Role '{role}' grants unknown permission '{name}'.")
+                mask |= self.bits[name]
+            self.masks[role] = mask
+        # Precompute the "_own" bit of every permission that has one.
+        self.own_bits = {
+            name: self.bits.get(name + OWN_SUFFIX, 0) for name in permissions
+        }
+
+    @classmethod
+    def from_settings(cls):
+        return cls(getattr(settings, 'RBAC_ROLE_PERMISSIONS', DEFAULT_ROLE_PERMISSIONS))
+
+    def has_perm(self, role, permission):
+        return bool(self.masks.get(role, 0) & self.bits[permission])
+
+    def has_perm_or_own(self, role, permission):
+        return bool(self.masks.get(role, 0) & (self.bits[permission] | self.own_bits[permission]))
+
+    def has_object_perm(self, user, permission, obj, owner_field='created_by_id'):
+        """
+        Grant `permission` on `obj` if the role has it outright, or if the
+        role has its "_own" variant and `user` owns the object.
+        """
+        mask = self.masks.get(user.role, 0)
+        if mask & self.bits[permission]:
+            return True
+        return bool(mask & self.own_bits[permission]) and getattr(obj, owner_field) == user.pk
+
+
+engine = PermissionEngine.from_settings()
+
+
+class RolePermission(BasePermission):
+    """
+    Checks the permission a view maps to the request method in its
+    `required_permissions` dict, e.g. {'GET': 'post.view'}. Methods that
+    are not listed are denied; HEAD falls back to the GET permission and
+    OPTIONS, which only describes the endpoint, is allowed.
+
+    At view level holding the "_own" variant is enough; the ownership
+    itself is checked in has_object_permission().
+    """
+    message = "Your role does not allow this action."
+
+    def get_required_permission(self, request, view):
+        permissions = getattr(view, 'required_permissions', {})
+        if request.method == 'HEAD' and 'HEAD' not in permissions:
+            return permissions.get('GET')
+        return permissions.get(request.method)
+
+    @staticmethod
+    def is_metadata(request, view):
+        return request.method == 'OPTIONS' and 'OPTIONS' not in getattr(view, 'required_permissions', {})
+
+    def has_permission(self, request, view):
+        if self.is_metadata(request, view):
+            return True
+        permission = self.get_required_permission(request, view)
+        if permission is None:
+            return False
+        return engine.has_perm_or_own(getattr(request.user, 'role', None), permission)
+
+    def has_object_permission(self, request, view, obj):
+        if self.is_metadata(request, view):
+            return True
+        permission = self.get_required_permission(request, view)
+        if permission is None:
+            return False
+        return engine.has_object_perm(request.user, permission, obj)
@@ -0,0 +1,124 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RevokedToken
+
+# Re-read rows slightly older than the watermark so clock skew between app
+# servers (revoked_at is set by the writer) can't hide a revocation.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings using double hashing of a single
+    blake2b digest.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        """
+        Add `value`; only values that set a new bit are counted, so adding
+        the same value again leaves `count` alone.
+        """
+        new = False
+        for position in self._positions(value):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationStore:
+    """
+    Revoked-token lookups served from an in-memory bloom filter in front of
+    the RevokedToken table.
+
+    A miss in the filter means "not revoked" without touching the database;
+    only filter hits (real revocations and rare false positives) are
+    confirmed with a primary-key lookup. Revocations made by other
+    processes are picked up incrementally every `sync_interval` seconds.
+    """
+
+    def __init__(self, capacity=100_000, error_rate=0.001, sync_interval=5):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'TOKEN_REVOCATION', {})
+        return cls(
+            capacity=options.get('BLOOM_CAPACITY', 100_000),
+            error_rate=options.get('BLOOM_ERROR_RATE', 0.001),
+            sync_interval=options.get('SYNC_INTERVAL', 5),
+        )
+
+    def _reset(self, capacity=None):
+        self._bloom = BloomFilter(capacity or self.capacity, self.error_rate)
+        self._watermark = None
+        self._synced_at = None
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self._bloom.count > self._bloom.capacity:
+                # Too full for its error rate; rebuild from live rows only,
+                # with room for as many again before the next rebuild.
+                live = RevokedToken.objects.filter(expires_at__gt=timezone.now()).count()
+                self._reset(max(self.capacity, 2 * live))
+            rows = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+            if self._watermark is not None:
+                rows = rows.filter(revoked_at__gte=self._watermark - SYNC_OVERLAP)
+            for jti, revoked_at in rows.values_list('jti', 'revoked_at').iterator(chunk_size=2000):
+                self._bloom.add(jti)
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            self._synced_at = now
+
+    def revoke(self, jti, expires_at):
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True
+        )
+        with self._lock:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        self.sync()
+        if jti not in self._bloom:
+            return False
+        return RevokedToken.objects.filter(pk=jti).exists()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+revocation_store = RevocationStore.from_settings()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from .models import User
-from django.contrib.auth.hashers import make_password
+from .hashing import hash_password
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,5 +10,14 @@ class UserSerializer(serializers.ModelSerializer):
         extra_kwargs = {'password': {'write_only': True}}
 
     def create(self, validated_data):
-        validated_data['password'] = make_password(validated_data['password'])
+        validated_data['password'] = hash_password(validated_data['password'])
         return super().create(validated_data)
+
+
+class BulkUserSerializer(UserSerializer):
+    """
+    Field-level validation only. Uniqueness is checked for a whole chunk of
+    rows at once by user_app.bulk instead of one query per field per row.
+    """
+    email = serializers.EmailField(max_length=254)
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
@@ -1,3 +1,432 @@
-from django.test import TestCase
+import json
+import threading
+import uuid
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from blog_app.cache import post_list_cache
+from blog_app.models import Post
+from .authentication import ClaimsUser
+from .bulk import BulkRegistration
+from .hashing import HashingBusy, HashingPool
+from .models import RevokedToken, User
+from .permissions import PermissionEngine
+from .revocation import BloomFilter, RevocationStore
+from .throttling import CacheBucketStore, LocalBucketStore, LoginThrottle, login_throttle
+from .tokens import RBACRefreshToken
+from .views import AsyncLoginView
+
+
+class StatelessAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        post_list_cache.clear()
+        login_throttle.reset()
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345', role='creator')
+        self.client = APIClient()
+
+    def authorize(self, user):
+        token = RBACRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_embeds_claims(self):
+        response = self.client.post(reverse('login'), {'email': 'user@example.com', 'password': 'pass12345'})
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.post(reverse('posts'), {'title': 'Hello', 'content': 'body'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_by'], 'user@example.com')
+
+    def test_authentication_skips_user_lookup(self):
+        self.authorize(self.user)
+        self.client.get(reverse('posts'))
+        # Cached list + claims-backed user: no query at all.
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('posts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.wsgi_request.user, ClaimsUser)
+
+    def test_create_post_runs_only_the_insert_and_counter(self):
+        self.authorize(self.user)
+        self.client.get(reverse('posts'))
+        # SAVEPOINT / INSERT / post_count UPDATE / RELEASE: no user lookup.
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('posts'), {'title': 'Hello', 'content': 'body'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Post.objects.get().created_by, self.user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.post_count, 1)
+
+    def test_revoked_tokens_are_rejected(self):
+        self.authorize(self.user)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.revoke_tokens()
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(response.status_code, 401)
+        self.authorize(self.user)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+
+    def test_role_change_revokes_tokens(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='pass12345', role='admin')
+        post = Post.objects.create(title='Hello', content='body', created_by=self.user)
+        self.authorize(other)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+        other.role = 'user'
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        response = self.client.delete(reverse('post_detail', args=[post.pk]))
+        self.assertEqual(response.status_code, 401)
+        self.authorize(other)
+        response = self.client.delete(reverse('post_detail', args=[post.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_unrelated_changes_keep_tokens(self):
+        self.authorize(self.user)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+
+    def test_inactive_users_are_rejected(self):
+        self.authorize(self.user)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'user_inactive')
+
+    def test_revocation_survives_a_cache_miss(self):
+        self.authorize(self.user)
+        self.user.revoke_tokens()
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 401)
+
+    def test_deleted_users_are_rejected(self):
+        self.authorize(self.user)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 401)
+
+    def test_rolled_back_revocation_keeps_tokens(self):
+        self.authorize(self.user)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.user.revoke_tokens()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.user.refresh_from_db()
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+        self.authorize(self.user)
+        self.assertEqual(self.client.get(reverse('posts')).status_code, 200)
+
+    def test_legacy_tokens_fall_back_to_database(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(reverse('posts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.wsgi_request.user, User)
+
+
+class PermissionEngineTests(TestCase):
+    def setUp(self):
+        self.engine = PermissionEngine({
+            'admin': {'post.view', 'post.delete'},
+            'user': {'post.view', 'post.delete_own'},
+        })
+        self.owner_id = uuid.uuid4()
+        self.post = SimpleNamespace(created_by_id=self.owner_id)
+
+    def test_role_permissions(self):
+        self.assertTrue(self.engine.has_perm('admin', 'post.delete'))
+        self.assertFalse(self.engine.has_perm('user', 'post.delete'))
+        self.assertTrue(self.engine.has_perm_or_own('user', 'post.delete'))
+        self.assertFalse(self.engine.has_perm('unknown', 'post.view'))
+
+    def test_ownership_rule(self):
+        owner = SimpleNamespace(role='user', pk=self.owner_id)
+        stranger = SimpleNamespace(role='user', pk=uuid.uuid4())
+        admin = SimpleNamespace(role='admin', pk=uuid.uuid4())
+        self.assertTrue(self.engine.has_object_perm(owner, 'post.delete', self.post))
+        self.assertFalse(self.engine.has_object_perm(stranger, 'post.delete', self.post))
+        self.assertTrue(self.engine.has_object_perm(admin, 'post.delete', self.post))
+
+    def test_unknown_permission_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            PermissionEngine({'admin': {'post.publish'}})
+
+    def test_unlisted_methods_are_denied(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(email='admin@example.com', username='admin', role='admin'))
+        self.assertEqual(client.put(reverse('posts'), {}).status_code, 403)
+        self.assertEqual(client.head(reverse('posts')).status_code, 200)
+
+    def test_options_is_allowed_for_every_role(self):
+        for role in ('user', 'creator', 'admin'):
+            client = APIClient()
+            client.force_authenticate(User.objects.create(email=f'{role}@example.com', username=role, role=role))
+            for url in (reverse('posts'), reverse('export', args=['posts'])):
+                response = client.options(url)
+                self.assertEqual(response.status_code, 200, (role, url))
+                self.assertIn('GET', response['Allow'])
+
+    def test_benchmark_enforces_the_minimum_rate(self):
+        with self.assertRaises(CommandError):
+            call_command('bench_permissions', decisions=1000, min_rate=float('inf'), stdout=StringIO())
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+        self.client = APIClient()
+
+    def test_logout_revokes_refresh_token(self):
+        refresh = str(RBACRefreshToken.for_user(self.user))
+        response = self.client.post(reverse('logout'), {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(RevokedToken.objects.exists())
+        response = self.client.post(reverse('logout'), {'refresh': refresh})
+        self.assertEqual(response.status_code, 400)
+
+    def test_store_answers_misses_from_memory(self):
+        store = RevocationStore(capacity=1000, sync_interval=60)
+        store.sync()
+        store.revoke('revoked-jti', timezone.now() + timedelta(days=1))
+        with self.assertNumQueries(0):
+            self.assertFalse(store.is_revoked('live-jti'))
+        self.assertTrue(store.is_revoked('revoked-jti'))
+
+    def test_store_sees_revocations_from_other_processes(self):
+        store = RevocationStore(capacity=1000, sync_interval=0)
+        self.assertFalse(store.is_revoked('other-jti'))
+        RevokedToken.objects.create(jti='other-jti', expires_at=timezone.now() + timedelta(days=1))
+        self.assertTrue(store.is_revoked('other-jti'))
+
+    def test_resync_counts_each_revocation_once(self):
+        store = RevocationStore(capacity=1000, sync_interval=0)
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti=f'jti-{i}', expires_at=timezone.now() + timedelta(days=1)) for i in range(20)
+        ])
+        for _ in range(3):
+            store.sync()
+        self.assertEqual(store._bloom.count, 20)
+
+    def test_rebuild_is_sized_from_live_rows(self):
+        store = RevocationStore(capacity=10, sync_interval=0)
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti=f'jti-{i}', expires_at=timezone.now() + timedelta(days=1)) for i in range(50)
+        ])
+        store.sync()
+        store.sync()
+        bloom = store._bloom
+        self.assertEqual(bloom.capacity, 100)
+        store.sync()
+        self.assertIs(store._bloom, bloom)
+        self.assertTrue(store.is_revoked('jti-0'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [str(uuid.uuid4()) for _ in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+
+    def test_purge_deletes_only_expired_rows(self):
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=f'old-{i}', expires_at=now - timedelta(hours=1)) for i in range(7)]
+            + [RevokedToken(jti='live', expires_at=now + timedelta(hours=1))]
+        )
+        out = StringIO()
+        call_command('purge_revoked_tokens', batch_size=3, stdout=out)
+        self.assertIn('Purged 7', out.getvalue())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        login_throttle.reset()
+        self.client = APIClient()
+
+    def login(self):
+        return self.client.post(reverse('login'), {'email': 'user@example.com', 'password': 'pass12345'})
+
+    def test_login_upgrades_outdated_hash(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+        self.assertIn('$1000$', User.objects.get().password)
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 200)
+            self.assertIn('$2000$', User.objects.get().password)
+            self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_register_hashes_on_the_pool(self):
+        response = self.client.post(reverse('register'), {
+            'email': 'new@example.com', 'username': 'new', 'password': 'pass12345',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.get().check_password('pass12345'))
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    async def test_async_login(self):
+        await User.objects.acreate(email='user@example.com', username='user', password=make_password('pass12345'))
+        view = AsyncLoginView.as_view()
+        factory = AsyncRequestFactory()
+        response = await view(factory.post('/user/login/', {'email': 'user@example.com', 'password': 'pass12345'},
+                                           content_type='application/json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        response = await view(factory.post('/user/login/', {'email': 'user@example.com', 'password': 'wrong'},
+                                           content_type='application/json'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_pool_rejects_when_full(self):
+        pool = HashingPool(workers=1, queue_size=0, wait_timeout=0.01)
+        release = threading.Event()
+        blocked = pool.submit(release.wait)
+        with self.assertRaises(HashingBusy):
+            pool.submit(lambda: None)
+        release.set()
+        blocked.result()
+        pool.wait_timeout = 1
+        self.assertIsNone(pool.run(lambda: None))
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+        self.throttle = LoginThrottle(LocalBucketStore(), ip_capacity=3, ip_rate=1 / 60, account_capacity=2, account_rate=1 / 60)
+        patcher = mock.patch('user_app.views.login_throttle', self.throttle)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def login(self, password='pass12345', email='user@example.com', ip='10.0.0.1'):
+        return self.client.post(reverse('login'), {'email': email, 'password': password}, REMOTE_ADDR=ip)
+
+    def test_ip_rejected_before_query_or_hash(self):
+        for i in range(3):
+            self.login(email=f'nobody{i}@example.com')
+        with mock.patch('user_app.views.check_user_password') as check, self.assertNumQueries(0):
+            response = self.login()
+        check.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(self.login(ip='10.0.0.2').status_code, 200)
+        self.assertEqual((self.throttle.allowed, self.throttle.rejected_ip), (4, 1))
+
+    def test_account_bucket_refilled_by_success(self):
+        self.assertEqual(self.login(password='wrong', ip='10.0.0.1').status_code, 401)
+        self.assertEqual(self.login(ip='10.0.0.2').status_code, 200)
+        self.assertEqual(self.login(password='wrong', ip='10.0.0.3').status_code, 401)
+        self.assertEqual(self.login(password='wrong', ip='10.0.0.4').status_code, 401)
+        self.assertEqual(self.login(ip='10.0.0.5').status_code, 429)
+        self.assertEqual(self.throttle.rejected_account, 1)
+        self.assertIn('rbac_login_attempts_total{outcome="rejected_account"} 1', self.throttle.render_prometheus())
+
+    def test_counters_are_thread_safe(self):
+        throttle = LoginThrottle(LocalBucketStore(), ip_capacity=10_000, account_capacity=10_000)
+
+        def attempts():
+            for _ in range(1000):
+                throttle.check('10.0.0.1', None)
+
+        threads = [threading.Thread(target=attempts) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(throttle.allowed, 8000)
+
+    def test_buckets_refill_over_time(self):
+        for store in (LocalBucketStore(), CacheBucketStore('default')):
+            with mock.patch('time.monotonic', return_value=1000.0), mock.patch('time.time', return_value=1000.0):
+                self.assertEqual(store.take('key', 1, 0.5), 0)
+                self.assertEqual(store.take('key', 1, 0.5), 2)
+            with mock.patch('time.monotonic', return_value=1002.0), mock.patch('time.time', return_value=1002.0):
+                self.assertEqual(store.take('key', 1, 0.5), 0)
+            store.reset('key')
+
+    async def test_async_login_throttled(self):
+        view = AsyncLoginView.as_view()
+        factory = AsyncRequestFactory()
+        for _ in range(3):
+            await view(factory.post('/user/login/', {'email': 'x@example.com', 'password': 'x'},
+                                    content_type='application/json', REMOTE_ADDR='10.0.0.9'))
+        response = await view(factory.post('/user/login/', {'email': 'user@example.com', 'password': 'pass12345'},
+                                           content_type='application/json', REMOTE_ADDR='10.0.0.9'))
+        self.assertEqual(response.status_code, 429)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, BULK_REGISTER_HASH_PROCESSES=0)
+class BulkRegistrationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@example.com', username='admin', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def rows(self, count, start=0):
+        return [
+            {'email': f'user{i}@example.com', 'username': f'user{i}', 'password': 'pass12345'}
+            for i in range(start, start + count)
+        ]
+
+    def test_json_array(self):
+        response = self.client.post(reverse('register_bulk'), self.rows(3), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 3)
+        self.assertTrue(User.objects.get(email='user2@example.com').check_password('pass12345'))
+
+    def test_ndjson_reports_rows(self):
+        rows = self.rows(2) + [{'email': 'admin@example.com', 'username': 'other', 'password': 'pass12345'}]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n{not json}\n' + json.dumps(self.rows(1)[0])
+        response = self.client.generic('POST', reverse('register_bulk'), body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        statuses = [(result['row'], result['status']) for result in response.data['results']]
+        self.assertEqual(statuses, [(0, 'created'), (1, 'created'), (2, 'error'), (3, 'error'), (4, 'error')])
+        self.assertIn('email', response.data['results'][2]['errors'])
+
+    def test_uniqueness_is_one_query_per_chunk(self):
+        registration = BulkRegistration(chunk_size=50)
+        # One IN query, then SAVEPOINT / bulk INSERT / RELEASE.
+        with self.assertNumQueries(4):
+            registration.run(self.rows(50))
+        self.assertEqual(registration.created, 50)
+
+    def test_row_limit(self):
+        registration = BulkRegistration(chunk_size=2, max_rows=3).run(self.rows(5))
+        self.assertEqual(registration.created, 3)
+        self.assertEqual(registration.results[-1]['row'], 3)
+        self.assertEqual(registration.results[-1]['status'], 'error')
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.create(email='u@example.com', username='u'))
+        response = self.client.post(reverse('register_bulk'), self.rows(1), format='json')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(BULK_REGISTER_HASH_PROCESSES=1)
+    def test_process_pool_hashing(self):
+        registration = BulkRegistration().run(self.rows(2))
+        self.assertEqual(registration.created, 2)
+        self.assertTrue(User.objects.get(email='user1@example.com').check_password('pass12345'))
@@ -0,0 +1,196 @@
+"""
+Login throttling: token buckets per client IP and per account.
+
+LoginView asks login_throttle before it looks the user up or hashes a
+password, so a credential-stuffing run is turned away for the price of a
+dictionary lookup instead of a PBKDF2/argon2 hash. A bucket holds up to
+`capacity` attempts and refills continuously at `rate` attempts per
+second, which behaves like a sliding window without storing timestamps.
+A successful login refills the account's bucket, so a user who mistypes a
+few times is not held back once they get in.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _refill(state, capacity, rate, now):
+    if state is None:
+        return capacity
+    tokens, stamp = state
+    return min(capacity, tokens + max(0.0, now - stamp) * rate)
+
+
+def _take(tokens, rate):
+    """
+    (tokens left, seconds until the next token) after one attempt; the
+    wait is 0 when the attempt is allowed.
+    """
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class LocalBucketStore:
+    """
+    Buckets in process memory, bounded to `max_keys` least recently used
+    keys. An evicted bucket was idle and starts again full.
+    """
+    blocking = False
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, wait = _take(_refill(self._buckets.get(key), capacity, rate, now), rate)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Buckets in a Django cache shared by all processes. The read and write
+    are not atomic, so concurrent attempts from several processes may each
+    spend the same token: a burst can exceed the capacity by up to the
+    number of processes, which is fine for throttling.
+    """
+    blocking = True
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def take(self, key, capacity, rate):
+        now = time.time()
+        tokens, wait = _take(_refill(self.cache.get(key), capacity, rate, now), rate)
+        # Once the bucket would be full again, the entry can go.
+        self.cache.set(key, (tokens, now), timeout=math.ceil((capacity - tokens) / rate) + 1)
+        return wait
+
+    def reset(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        # Entries expire on their own; clearing the whole alias would take
+        # unrelated keys with it.
+        pass
+
+
+class LoginThrottle:
+    def __init__(self, store, ip_capacity=20, ip_rate=20 / 60, account_capacity=10, account_rate=5 / 60,
+                 enabled=True):
+        self.store = store
+        self.ip_capacity = ip_capacity
+        self.ip_rate = ip_rate
+        self.account_capacity = account_capacity
+        self.account_rate = account_rate
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected_ip = 0
+        self.rejected_account = 0
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'LOGIN_THROTTLE', {})
+        alias = options.get('SHARED_ALIAS')
+        store = CacheBucketStore(alias) if alias else LocalBucketStore(options.get('MAX_KEYS', 100_000))
+        return cls(
+            store,
+            ip_capacity=options.get('IP_CAPACITY', 20),
+            ip_rate=options.get('IP_REFILL_PER_MINUTE', 20) / 60,
+            account_capacity=options.get('ACCOUNT_CAPACITY', 10),
+            account_rate=options.get('ACCOUNT_REFILL_PER_MINUTE', 5) / 60,
+            enabled=options.get('ENABLED', True),
+        )
+
+    @staticmethod
+    def account_key(email):
+        # Hashed so that any email makes a valid cache key.
+        digest = hashlib.blake2b(str(email).strip().lower().encode(), digest_size=16).hexdigest()
+        return f'login-throttle:account:{digest}'
+
+    def check(self, ip, email):
+        """
+        Spend one attempt from the client's and the account's buckets.
+        Returns None if the attempt may go ahead, else the number of
+        seconds to wait.
+        """
+        if not self.enabled:
+            return None
+        wait = self.store.take(f'login-throttle:ip:{ip}', self.ip_capacity, self.ip_rate)
+        if wait:
+            with self._lock:
+                self.rejected_ip += 1
+            return wait
+        if email:
+            wait = self.store.take(self.account_key(email), self.account_capacity, self.account_rate)
+            if wait:
+                with self._lock:
+                    self.rejected_account += 1
+                return wait
+        with self._lock:
+            self.allowed += 1
+        return None
+
+    async def acheck(self, ip, email):
+        if self.store.blocking:
+            return await sync_to_async(self.check)(ip, email)
+        return self.check(ip, email)
+
+    def succeeded(self, email):
+        if self.enabled:
+            self.store.reset(self.account_key(email))
+
+    async def asucceeded(self, email):
+        if self.store.blocking:
+            return await sync_to_async(self.succeeded)(email)
+        return self.succeeded(email)
+
+    def render_prometheus(self):
+        with self._lock:
+            allowed, rejected_ip, rejected_account = self.allowed, self.rejected_ip, self.rejected_account
+        return '\n'.join([
+            '# HELP rbac_login_attempts_total Login attempts seen by the throttle, by outcome.',
+            '# TYPE rbac_login_attempts_total counter',
+            f'rbac_login_attempts_total{{outcome="allowed"}} {allowed}',
+            f'rbac_login_attempts_total{{outcome="rejected_ip"}} {rejected_ip}',
+            f'rbac_login_attempts_total{{outcome="rejected_account"}} {rejected_account}',
+        ]) + '\n'
+
+    def reset(self):
+        self.store.clear()
+        with self._lock:
+            self.allowed = self.rejected_ip = self.rejected_account = 0
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+login_throttle = LoginThrottle.from_settings()
@@ -0,0 +1,37 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .revocation import revocation_store
+
+
+class RBACRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims StatelessJWTAuthentication needs to
+    build a user without a database lookup. Access tokens derived from it
+    inherit the same claims.
+
+    Revocation goes through user_app.revocation instead of simplejwt's
+    token_blacklist app, which would also write a row for every login.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['email'] = user.email
+        token['role'] = user.role
+        token['token_version'] = user.token_version
+        return token
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if revocation_store.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        revocation_store.revoke(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload['exp']),
+        )
@@ -1,8 +1,13 @@
+from django.conf import settings
 from django.urls import path
-from .views import RegisterView, LoginView, LogoutView
+from .views import RegisterView, BulkRegisterView, LoginView, AsyncLoginView, LogoutView
+
+if settings.ASYNC_VIEWS:
+    LoginView = AsyncLoginView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
+    path('register/bulk/', BulkRegisterView.as_view(), name='register_bulk'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
 ]
@@ -1,9 +1,20 @@
+import math
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework import status
 from .models import User
 from .serializers import UserSerializer
+from .tokens import RBACRefreshToken
+from .hashing import HashingBusy, acheck_user_password, check_user_password
+from .throttling import client_ip, login_throttle
+from .bulk import BulkRegistration
+from .permissions import RolePermission
+from RBAC_Project.async_views import AsyncAPIView, inherit_schema
+from RBAC_Project.fastjson import FastJSONParser
+from RBAC_Project.ndjson import NDJSONParser
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
@@ -31,6 +42,14 @@ class RegisterView(APIView):
                     }
                 }
             ),
+            503: openapi.Response(
+                description="Password hashing is overloaded.",
+                examples={
+                    "application/json": {
+                        "message": "Password hashing is overloaded, try again later."
+                    }
+                }
+            ),
             500: openapi.Response(
                 description="Server error.",
                 examples={
@@ -48,9 +67,86 @@ class RegisterView(APIView):
                 serializer.save()
                 return Response({"message": "User registered successfully"}, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except HashingBusy as e:
+            return Response({"message": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({"message": f"Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Bulk User Registration View
+class BulkRegisterView(APIView):
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_permissions = {'POST': 'user.bulk_register'}
+    parser_classes = [FastJSONParser, NDJSONParser]
+
+    @swagger_auto_schema(
+        operation_id="Bulk Register Users",
+        operation_description=(
+            "API to register many users at once (admin only). Send a JSON array of users, "
+            "or an `application/x-ndjson` body with one user per line. Each row is reported "
+            "separately; valid rows are created even when others fail."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'email': openapi.Schema(type=openapi.TYPE_STRING),
+                'username': openapi.Schema(type=openapi.TYPE_STRING),
+                'password': openapi.Schema(type=openapi.TYPE_STRING),
+                'role': openapi.Schema(type=openapi.TYPE_STRING),
+            },
+            required=['email', 'username', 'password'],
+        )),
+        responses={
+            200: openapi.Response(
+                description="Rows processed.",
+                examples={
+                    "application/json": {
+                        "created": 1,
+                        "failed": 1,
+                        "results": [
+                            {"row": 0, "status": "created", "id": "<uuid>"},
+                            {"row": 1, "status": "error", "errors": {"email": ["user with this email already exists."]}}
+                        ]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="The body is not a list of users.",
+                examples={
+                    "application/json": {
+                        "message": "Expected a list of users."
+                    }
+                }
+            ),
+            500: openapi.Response(
+                description="Server error.",
+                examples={
+                    "application/json": {
+                        "message": "Error: <error_details>"
+                    }
+                }
+            ),
+        }
+    )
+    def post(self, request):
+        try:
+            rows = request.data
+            if isinstance(rows, dict):
+                return Response({"message": "Expected a list of users."}, status=status.HTTP_400_BAD_REQUEST)
+            registration = BulkRegistration().run(rows)
+            return Response({
+                "created": registration.created,
+                "failed": registration.failed,
+                "results": registration.results,
+            }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"message": f"Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def login_throttled(wait):
+    response = Response({"message": "Too many login attempts, try again later."},
+                        status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
 # User Login View
 class LoginView(APIView):
     @swagger_auto_schema(
@@ -90,6 +186,22 @@ class LoginView(APIView):
                     }
                 }
             ),
+            429: openapi.Response(
+                description="Too many attempts from this client or for this account; see Retry-After.",
+                examples={
+                    "application/json": {
+                        "message": "Too many login attempts, try again later."
+                    }
+                }
+            ),
+            503: openapi.Response(
+                description="Password hashing is overloaded.",
+                examples={
+                    "application/json": {
+                        "message": "Password hashing is overloaded, try again later."
+                    }
+                }
+            ),
             500: openapi.Response(
                 description="Server error.",
                 examples={
@@ -105,11 +217,48 @@ class LoginView(APIView):
             email = request.data.get('email')
             password = request.data.get('password')
 
+            # Before any query or hashing.
+            wait = login_throttle.check(client_ip(request), email)
+            if wait:
+                return login_throttled(wait)
+
             user = User.objects.get(email=email)
-            if not user.check_password(password):
+            if not check_user_password(user, password):
+                return Response({"message": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+            login_throttle.succeeded(email)
+
+            refresh = RBACRefreshToken.for_user(user)
+            return Response({
+                "refresh": str(refresh),
+                "access": str(refresh.access_token),
+            }, status=status.HTTP_200_OK)
+
+        except User.DoesNotExist:
+            return Response({"message": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+        except HashingBusy as e:
+            return Response({"message": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({"message": f"Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Async variant of LoginView, served when settings.ASYNC_VIEWS is on
+class AsyncLoginView(AsyncAPIView, LoginView):
+
+    @inherit_schema(LoginView.post)
+    async def post(self, request):
+        try:
+            email = request.data.get('email')
+            password = request.data.get('password')
+
+            wait = await login_throttle.acheck(client_ip(request), email)
+            if wait:
+                return login_throttled(wait)
+
+            user = await User.objects.aget(email=email)
+            if not await acheck_user_password(user, password):
                 return Response({"message": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+            await login_throttle.asucceeded(email)
 
-            refresh = RefreshToken.for_user(user)
+            refresh = RBACRefreshToken.for_user(user)
             return Response({
                 "refresh": str(refresh),
                 "access": str(refresh.access_token),
@@ -117,6 +266,8 @@ class LoginView(APIView):
 
         except User.DoesNotExist:
             return Response({"message": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+        except HashingBusy as e:
+            return Response({"message": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({"message": f"Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -142,7 +293,7 @@ class LogoutView(APIView):
                 }
             ),
             400: openapi.Response(
-                description="Refresh token is missing.",
+                description="Refresh token is missing, invalid, expired or already revoked.",
                 examples={
                     "application/json": {
                         "message": "Refresh token is required"
@@ -165,9 +316,11 @@ class LogoutView(APIView):
             if not token:
                 return Response({"message": "Refresh token is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            refresh_token = RefreshToken(token)
+            refresh_token = RBACRefreshToken(token)
             refresh_token.blacklist()
             return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
 
+        except TokenError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"message": f"Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file